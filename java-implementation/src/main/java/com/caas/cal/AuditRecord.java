@@ -39,6 +39,12 @@ public class AuditRecord {
         this.metadata = new HashMap<>();
     }
 
+    /**
+     * Compute the SHA-256 hash of this record's gson JSON form.
+     *
+     * This does not implement the Python record hash scheme (length-prefixed
+     * fields, version 2), so hashes are not comparable across implementations.
+     */
     public String computeHash() {
         try {
             Map<String, Object> data = new LinkedHashMap<>();
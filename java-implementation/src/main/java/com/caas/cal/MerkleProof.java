@@ -1,8 +1,6 @@
 package com.caas.cal;
 
-import java.nio.charset.StandardCharsets;
-import java.security.MessageDigest;
-import java.security.NoSuchAlgorithmException;
+import java.util.Arrays;
 import java.util.List;
 
 /**
@@ -30,6 +28,12 @@ class ProofElement {
  * Represents a Merkle inclusion proof.
  */
 public class MerkleProof {
+    /**
+     * Merkle node hashing scheme: version 1 hashed concatenated hex strings,
+     * version 2 hashes concatenated raw 32-byte digests.
+     */
+    public static final int SCHEME_VERSION = 2;
+
     private String leafHash;
     private String rootHash;
     private List<ProofElement> proofHashes;
@@ -46,34 +50,23 @@ public class MerkleProof {
      * @return true if proof is valid
      */
     public boolean verify() {
-        String currentHash = leafHash;
-
-        for (ProofElement element : proofHashes) {
-            String combined;
-            if ("left".equals(element.getPosition())) {
-                combined = element.getHash() + currentHash;
-            } else {
-                combined = currentHash + element.getHash();
-            }
-
-            currentHash = sha256(combined);
-        }
-
-        return currentHash.equals(rootHash);
-    }
+        byte[] current = MerkleTree.toDigest(leafHash);
 
-    private String sha256(String input) {
         try {
-            MessageDigest digest = MessageDigest.getInstance("SHA-256");
-            byte[] hash = digest.digest(input.getBytes(StandardCharsets.UTF_8));
-            StringBuilder result = new StringBuilder();
-            for (byte b : hash) {
-                result.append(String.format("%02x", b));
+            for (ProofElement element : proofHashes) {
+                byte[] sibling = MerkleTree.fromHex(element.getHash());
+                if ("left".equals(element.getPosition())) {
+                    current = MerkleTree.hashPair(sibling, current);
+                } else {
+                    current = MerkleTree.hashPair(current, sibling);
+                }
             }
-            return result.toString();
-        } catch (NoSuchAlgorithmException e) {
-            throw new RuntimeException("SHA-256 algorithm not available", e);
+        } catch (IllegalArgumentException e) {
+            // Malformed hex in the proof path
+            return false;
         }
+
+        return Arrays.equals(current, MerkleTree.toDigest(rootHash));
     }
 
     // Getters
@@ -88,4 +81,8 @@ public class MerkleProof {
     public List<ProofElement> getProofHashes() {
         return proofHashes;
     }
+
+    public int getSchemeVersion() {
+        return SCHEME_VERSION;
+    }
 }
@@ -6,162 +6,139 @@ import java.security.NoSuchAlgorithmException;
 import java.util.ArrayList;
 import java.util.List;
 
-/**
- * Represents a node in a Merkle tree.
- */
-class MerkleNode {
-    private String hash;
-    private MerkleNode left;
-    private MerkleNode right;
-
-    public MerkleNode(String hash) {
-        this(hash, null, null);
-    }
-
-    public MerkleNode(String hash, MerkleNode left, MerkleNode right) {
-        this.hash = hash;
-        this.left = left;
-        this.right = right;
-    }
-
-    public boolean isLeaf() {
-        return left == null && right == null;
-    }
-
-    public String getHash() {
-        return hash;
-    }
-
-    public MerkleNode getLeft() {
-        return left;
-    }
-
-    public MerkleNode getRight() {
-        return right;
-    }
-}
-
 /**
  * Merkle tree implementation for efficient inclusion proofs.
+ *
+ * Nodes are raw 32-byte SHA-256 digests and each parent is the SHA-256 of
+ * its children's concatenated digests (hash scheme version
+ * {@link MerkleProof#SCHEME_VERSION}, shared with the Python implementation).
+ * A 64-character hex leaf is decoded to its digest; any other leaf value is
+ * first hashed with SHA-256. An odd last node is paired with itself.
  */
 public class MerkleTree {
     private List<String> leaves;
-    private MerkleNode root;
+    // levels.get(0) holds the leaf digests, the last level holds the root
+    private List<List<byte[]>> levels;
 
     public MerkleTree(List<String> leaves) {
         this.leaves = new ArrayList<>(leaves);
-        this.root = buildTree(new ArrayList<>(leaves));
+        this.levels = buildLevels(this.leaves);
     }
 
-    private MerkleNode buildTree(List<String> hashes) {
-        if (hashes.isEmpty()) {
-            return null;
-        }
-
-        if (hashes.size() == 1) {
-            return new MerkleNode(hashes.get(0));
+    private static List<List<byte[]>> buildLevels(List<String> leaves) {
+        List<List<byte[]>> levels = new ArrayList<>();
+        if (leaves.isEmpty()) {
+            return levels;
         }
 
-        // Build current level
-        List<MerkleNode> nodes = new ArrayList<>();
-        for (String hash : hashes) {
-            nodes.add(new MerkleNode(hash));
+        List<byte[]> current = new ArrayList<>();
+        for (String leaf : leaves) {
+            current.add(toDigest(leaf));
         }
+        levels.add(current);
 
         // Build tree bottom-up
-        while (nodes.size() > 1) {
-            List<MerkleNode> nextLevel = new ArrayList<>();
-
-            for (int i = 0; i < nodes.size(); i += 2) {
-                MerkleNode left = nodes.get(i);
-                MerkleNode right;
-
-                if (i + 1 < nodes.size()) {
-                    right = nodes.get(i + 1);
-                } else {
-                    // Duplicate last node if odd number
-                    right = nodes.get(i);
-                }
-
-                // Combine hashes
-                String combined = left.getHash() + right.getHash();
-                String parentHash = sha256(combined);
-                nextLevel.add(new MerkleNode(parentHash, left, right));
+        while (current.size() > 1) {
+            List<byte[]> nextLevel = new ArrayList<>();
+
+            for (int i = 0; i < current.size(); i += 2) {
+                byte[] left = current.get(i);
+                // Duplicate last node if odd number
+                byte[] right = i + 1 < current.size() ? current.get(i + 1) : left;
+                nextLevel.add(hashPair(left, right));
             }
 
-            nodes = nextLevel;
+            levels.add(nextLevel);
+            current = nextLevel;
         }
 
-        return nodes.get(0);
+        return levels;
     }
 
     public String getRootHash() {
-        return root != null ? root.getHash() : "";
+        if (leaves.isEmpty()) {
+            return "";
+        }
+        if (leaves.size() == 1) {
+            // A lone leaf is its own root
+            return leaves.get(0);
+        }
+        return toHex(levels.get(levels.size() - 1).get(0));
     }
 
     public MerkleProof generateProof(String leafHash) {
-        if (!leaves.contains(leafHash)) {
+        int index = leaves.indexOf(leafHash);
+        if (index < 0) {
             return null;
         }
 
-        int leafIndex = leaves.indexOf(leafHash);
         List<ProofElement> proofHashes = new ArrayList<>();
 
-        // Get proof path
-        List<MerkleNode> currentLevel = new ArrayList<>();
-        for (String hash : leaves) {
-            currentLevel.add(new MerkleNode(hash));
-        }
-        int currentIndex = leafIndex;
-
-        while (currentLevel.size() > 1) {
-            List<MerkleNode> nextLevel = new ArrayList<>();
-
-            for (int i = 0; i < currentLevel.size(); i += 2) {
-                MerkleNode left = currentLevel.get(i);
-                MerkleNode right;
-
-                if (i + 1 < currentLevel.size()) {
-                    right = currentLevel.get(i + 1);
-                } else {
-                    right = currentLevel.get(i);
-                }
-
-                // If current node is part of the proof path
-                if (i == currentIndex || i + 1 == currentIndex) {
-                    if (i == currentIndex) {
-                        // Current is left, need right sibling
-                        if (i + 1 < currentLevel.size() && right != left) {
-                            proofHashes.add(new ProofElement(right.getHash(), "right"));
-                        }
-                        currentIndex = i / 2;
-                    } else {
-                        // Current is right, need left sibling
-                        proofHashes.add(new ProofElement(left.getHash(), "left"));
-                        currentIndex = i / 2;
-                    }
-                }
-
-                String combined = left.getHash() + right.getHash();
-                String parentHash = sha256(combined);
-                nextLevel.add(new MerkleNode(parentHash, left, right));
+        for (int level = 0; level < levels.size() - 1; level++) {
+            List<byte[]> nodes = levels.get(level);
+
+            int sibling = index ^ 1;
+            if (sibling >= nodes.size()) {
+                // Odd node was paired with itself
+                sibling = index;
             }
 
-            currentLevel = nextLevel;
+            String position = sibling < index ? "left" : "right";
+            proofHashes.add(new ProofElement(toHex(nodes.get(sibling)), position));
+            index >>= 1;
         }
 
         return new MerkleProof(leafHash, getRootHash(), proofHashes);
     }
 
-    private String sha256(String input) {
-        try {
-            MessageDigest digest = MessageDigest.getInstance("SHA-256");
-            byte[] hash = digest.digest(input.getBytes(StandardCharsets.UTF_8));
-            StringBuilder result = new StringBuilder();
-            for (byte b : hash) {
-                result.append(String.format("%02x", b));
+    /**
+     * Convert a leaf or node hash to its raw 32-byte digest.
+     */
+    static byte[] toDigest(String value) {
+        if (value.length() == 64) {
+            try {
+                return fromHex(value);
+            } catch (IllegalArgumentException e) {
+                // Not hex; hash it like any other leaf value
             }
-            return result.toString();
+        }
+        return sha256().digest(value.getBytes(StandardCharsets.UTF_8));
+    }
+
+    static byte[] hashPair(byte[] left, byte[] right) {
+        MessageDigest digest = sha256();
+        digest.update(left);
+        digest.update(right);
+        return digest.digest();
+    }
+
+    static byte[] fromHex(String hex) {
+        if (hex.length() % 2 != 0) {
+            throw new IllegalArgumentException("Odd-length hex string");
+        }
+        byte[] bytes = new byte[hex.length() / 2];
+        for (int i = 0; i < bytes.length; i++) {
+            int high = Character.digit(hex.charAt(2 * i), 16);
+            int low = Character.digit(hex.charAt(2 * i + 1), 16);
+            if (high < 0 || low < 0) {
+                throw new IllegalArgumentException("Invalid hex string: " + hex);
+            }
+            bytes[i] = (byte) ((high << 4) | low);
+        }
+        return bytes;
+    }
+
+    static String toHex(byte[] bytes) {
+        StringBuilder result = new StringBuilder();
+        for (byte b : bytes) {
+            result.append(String.format("%02x", b));
+        }
+        return result.toString();
+    }
+
+    private static MessageDigest sha256() {
+        try {
+            return MessageDigest.getInstance("SHA-256");
         } catch (NoSuchAlgorithmException e) {
             throw new RuntimeException("SHA-256 algorithm not available", e);
         }
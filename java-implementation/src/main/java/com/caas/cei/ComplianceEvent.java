@@ -50,6 +50,12 @@ public class ComplianceEvent {
         return map;
     }
 
+    /**
+     * Compute the SHA-256 hash of this event's gson JSON form.
+     *
+     * This does not implement the Python record hash scheme (length-prefixed
+     * fields, version 2), so hashes are not comparable across implementations.
+     */
     public String computeHash() {
         try {
             String jsonData = gson.toJson(toMap());
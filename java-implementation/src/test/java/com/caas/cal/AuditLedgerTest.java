@@ -180,6 +180,21 @@ class AuditLedgerTest {
         assertTrue(proof.verify());
     }
 
+    @Test
+    void testMerkleRootMatchesPythonImplementation() {
+        // Root of caas.cal.MerkleTree(["hash1", "hash2", "hash3"]) under scheme version 2
+        MerkleTree tree = new MerkleTree(Arrays.asList("hash1", "hash2", "hash3"));
+
+        assertEquals(2, MerkleProof.SCHEME_VERSION);
+        assertEquals(
+            "99d8e6491946cd229bdbe0cf18720bdf71f124fc825f9b32f6287b83156eb6c2",
+            tree.getRootHash()
+        );
+        for (String leaf : Arrays.asList("hash1", "hash2", "hash3")) {
+            assertTrue(tree.generateProof(leaf).verify());
+        }
+    }
+
     @Test
     void testGetLatestRecord() {
         AuditLedger ledger = new AuditLedger();
@@ -17,7 +17,13 @@ setup(
             "pytest>=7.4.0",
             "pytest-asyncio>=0.21.0",
             "pytest-cov>=4.1.0",
-        ]
+        ],
+        "blake3": [
+            "blake3>=0.3.0",
+        ],
+        "orjson": [
+            "orjson>=3.9.0",
+        ],
     },
     python_requires=">=3.8",
 )
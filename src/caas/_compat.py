@@ -0,0 +1,42 @@
+"""
+Compatibility helpers shared by the CaaS components.
+"""
+
+from typing import Any
+import json
+import sys
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+# ``@dataclass(slots=True)`` needs Python 3.10+; older interpreters keep
+# per-instance ``__dict__`` storage.
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def json_dumps(value: Any, indent: bool = False) -> str:
+    """
+    Serialize a JSON-compatible value for export.
+    
+    Uses orjson when it is installed and falls back to the standard
+    library otherwise, or when orjson rejects the value (for example,
+    non-string dict keys, which ``json.dumps`` coerces). Not for hash
+    preimages: the two encoders differ in float formatting and non-ASCII
+    escaping.
+    
+    Args:
+        value: Value to serialize
+        indent: Pretty-print with two-space indentation
+        
+    Returns:
+        JSON string
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+        except TypeError:  # orjson.JSONEncodeError subclasses TypeError
+            pass
+    return json.dumps(value, indent=2 if indent else None)
@@ -0,0 +1,34 @@
+"""
+Hash preimage encoding shared by the CaaS components.
+"""
+
+from typing import Iterable, Optional
+
+
+# Length marker for an absent (None) field; real fields are shorter
+_ABSENT = b"\xff\xff\xff\xff"
+
+
+def pack_fields(fields: Iterable[Optional[bytes]]) -> bytes:
+    """
+    Concatenate fields into an unambiguous hash preimage.
+    
+    Each field is written as its length (4-byte big-endian) followed by
+    its bytes, so no field content can shift bytes across a boundary. An
+    absent field is written as the reserved length 0xFFFFFFFF with no
+    bytes, which keeps None distinct from an empty string.
+    
+    Args:
+        fields: Encoded field values, None for absent optional fields
+    
+    Returns:
+        Preimage bytes
+    """
+    parts = []
+    for value in fields:
+        if value is None:
+            parts.append(_ABSENT)
+        else:
+            parts.append(len(value).to_bytes(4, "big"))
+            parts.append(value)
+    return b"".join(parts)
@@ -5,15 +5,23 @@ Multi-level audit pipeline with configurable fidelity levels.
 Supports dynamic configuration based on policy criticality, tenant, bucket, or object class.
 """
 
+from collections import Counter
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Tuple
 from datetime import datetime
+import itertools
+import logging
+import sys
 import uuid
 
 from ..cei import ComplianceEvent, EventType
 from ..pac import CanonicalPolicy
 from ..cal import AuditRecord, AuditLedger
+from .._compat import DATACLASS_SLOTS
+
+
+logger = logging.getLogger(__name__)
 
 
 class AuditFidelity(Enum):
@@ -32,12 +40,18 @@ class PolicyCriticality(Enum):
     CRITICAL = "critical"
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class AuditConfiguration:
-    """Configuration for audit pipeline."""
+    """
+    Configuration for audit pipeline.
+    
+    ``bucket_configs`` is keyed by ``(tenant_id, bucket)`` tuples. Earlier
+    versions used ``"tenant_id/bucket"`` strings, which are no longer
+    matched; ``set_bucket_fidelity`` builds the right key.
+    """
     default_fidelity: AuditFidelity = AuditFidelity.CHAINED
     tenant_configs: Dict[str, AuditFidelity] = field(default_factory=dict)
-    bucket_configs: Dict[str, AuditFidelity] = field(default_factory=dict)
+    bucket_configs: Dict[Tuple[str, str], AuditFidelity] = field(default_factory=dict)
     criticality_configs: Dict[PolicyCriticality, AuditFidelity] = field(
         default_factory=lambda: {
             PolicyCriticality.LOW: AuditFidelity.METADATA_ONLY,
@@ -65,13 +79,16 @@ class AuditConfiguration:
             Appropriate audit fidelity level
         """
         # Check tenant-specific config
-        if tenant_id in self.tenant_configs:
-            return self.tenant_configs[tenant_id]
+        if self.tenant_configs:
+            fidelity = self.tenant_configs.get(tenant_id)
+            if fidelity is not None:
+                return fidelity
         
         # Check bucket-specific config
-        bucket_key = f"{tenant_id}/{bucket}"
-        if bucket_key in self.bucket_configs:
-            return self.bucket_configs[bucket_key]
+        if self.bucket_configs:
+            fidelity = self.bucket_configs.get((tenant_id, bucket))
+            if fidelity is not None:
+                return fidelity
         
         # Check criticality-based config
         if criticality and criticality in self.criticality_configs:
@@ -81,7 +98,13 @@ class AuditConfiguration:
         return self.default_fidelity
 
 
-@dataclass
+_POLICY_BOUND_FIDELITIES = frozenset({
+    AuditFidelity.POLICY_BOUND,
+    AuditFidelity.MERKLE_PROOF,
+})
+
+
+@dataclass(**DATACLASS_SLOTS)
 class ProcessedAuditEvent:
     """Represents a processed audit event with selected fidelity."""
     event: ComplianceEvent
@@ -105,7 +128,8 @@ class AdaptiveAuditPipeline:
     def __init__(
         self, 
         ledger: AuditLedger,
-        config: Optional[AuditConfiguration] = None
+        config: Optional[AuditConfiguration] = None,
+        id_factory: Optional[Callable[[], str]] = None
     ):
         """
         Initialize the adaptive audit pipeline.
@@ -113,11 +137,18 @@ class AdaptiveAuditPipeline:
         Args:
             ledger: Cryptographic audit ledger
             config: Audit configuration (uses defaults if not provided)
+            id_factory: Optional callable producing record IDs (defaults to
+                a per-pipeline prefix plus a monotonically increasing counter)
         """
         self.ledger = ledger
         self.config = config or AuditConfiguration()
+        self._pipeline_id = uuid.uuid4().hex[:8]
+        self._record_seq = itertools.count()
+        self._id_factory = id_factory
         self.processed_events: List[ProcessedAuditEvent] = []
+        self._fidelity_counts: Counter = Counter()
         self.event_handlers: List[Callable[[ProcessedAuditEvent], None]] = []
+        self._handlers_tuple: Tuple[Callable[[ProcessedAuditEvent], None], ...] = ()
     
     def register_handler(
         self, 
@@ -130,6 +161,7 @@ class AdaptiveAuditPipeline:
             handler: Callback function
         """
         self.event_handlers.append(handler)
+        self._handlers_tuple = tuple(self.event_handlers)
     
     def process_event(
         self, 
@@ -148,6 +180,10 @@ class AdaptiveAuditPipeline:
         Returns:
             ProcessedAuditEvent with applied fidelity
         """
+        # Intern routing keys so records share one object per tenant/bucket
+        event.tenant_id = sys.intern(event.tenant_id)
+        event.bucket = sys.intern(event.bucket)
+        
         # Determine appropriate fidelity
         fidelity = self.config.get_fidelity(
             event.tenant_id, 
@@ -155,33 +191,16 @@ class AdaptiveAuditPipeline:
             criticality
         )
         
-        # Create audit record based on fidelity
-        audit_record = None
+        # Only policy-bound fidelities carry the policy commitment
         policy_commitment = None
+        if policy and fidelity in _POLICY_BOUND_FIDELITIES:
+            policy_commitment = policy.commitment_hash
         
-        if fidelity == AuditFidelity.METADATA_ONLY:
-            # Minimal record - metadata only
-            audit_record = self._create_metadata_record(event)
-            
-        elif fidelity == AuditFidelity.CHAINED:
-            # Hash-chained record
-            audit_record = self._create_chained_record(event)
-            
-        elif fidelity == AuditFidelity.POLICY_BOUND:
-            # Include policy commitment
-            if policy:
-                policy_commitment = policy.commitment_hash
-            audit_record = self._create_policy_bound_record(event, policy_commitment)
-            
-        elif fidelity == AuditFidelity.MERKLE_PROOF:
-            # Full record with Merkle tree support
-            if policy:
-                policy_commitment = policy.commitment_hash
-            audit_record = self._create_merkle_record(event, policy_commitment)
+        # Create audit record based on fidelity
+        audit_record = self._make_record(event, fidelity, policy_commitment)
         
-        # Append to ledger if record was created
-        if audit_record:
-            self.ledger.append(audit_record)
+        # Append to ledger
+        self.ledger.append(audit_record)
         
         # Create processed event
         processed = ProcessedAuditEvent(
@@ -192,79 +211,57 @@ class AdaptiveAuditPipeline:
         )
         
         self.processed_events.append(processed)
+        self._fidelity_counts[fidelity] += 1
         
         # Call registered handlers
-        for handler in self.event_handlers:
+        for handler in self._handlers_tuple:
             try:
                 handler(processed)
-            except Exception as e:
-                print(f"Handler error: {e}")
+            except Exception:
+                logger.exception("Handler error for event %s", event.event_id)
         
         return processed
     
-    def _create_metadata_record(self, event: ComplianceEvent) -> AuditRecord:
-        """Create a metadata-only audit record."""
-        return AuditRecord(
-            record_id=str(uuid.uuid4()),
-            event_id=event.event_id,
-            timestamp=event.timestamp,
-            event_type=event.event_type.value,
-            tenant_id=event.tenant_id,
-            bucket=event.bucket,
-            object_key=event.object_key,
-            metadata={
-                "fidelity": AuditFidelity.METADATA_ONLY.value,
-                "principal": event.principal,
-            }
-        )
-    
-    def _create_chained_record(self, event: ComplianceEvent) -> AuditRecord:
-        """Create a hash-chained audit record."""
-        return AuditRecord(
-            record_id=str(uuid.uuid4()),
-            event_id=event.event_id,
-            timestamp=event.timestamp,
-            event_type=event.event_type.value,
-            tenant_id=event.tenant_id,
-            bucket=event.bucket,
-            object_key=event.object_key,
-            metadata={
-                "fidelity": AuditFidelity.CHAINED.value,
-                "principal": event.principal,
-                "event_metadata": event.metadata,
-            }
-        )
-    
-    def _create_policy_bound_record(
-        self, 
-        event: ComplianceEvent,
-        policy_commitment: Optional[str]
-    ) -> AuditRecord:
-        """Create a policy-bound audit record."""
-        return AuditRecord(
-            record_id=str(uuid.uuid4()),
-            event_id=event.event_id,
-            timestamp=event.timestamp,
-            event_type=event.event_type.value,
-            tenant_id=event.tenant_id,
-            bucket=event.bucket,
-            object_key=event.object_key,
-            policy_commitment=policy_commitment,
-            metadata={
-                "fidelity": AuditFidelity.POLICY_BOUND.value,
-                "principal": event.principal,
-                "event_metadata": event.metadata,
-            }
-        )
+    def new_record_id(self) -> str:
+        """
+        Generate a record ID that is unique within this pipeline.
+        
+        Without an ``id_factory`` the ID is ``"<pipeline_id>-<seq>"``: an
+        8-hex-digit prefix drawn randomly per pipeline, then the record
+        sequence number as 16 zero-padded hex digits. Earlier versions
+        used ``str(uuid.uuid4())``; pass ``id_factory`` to keep that.
+        
+        Returns:
+            Record ID string
+        """
+        if self._id_factory is not None:
+            return self._id_factory()
+        return f"{self._pipeline_id}-{next(self._record_seq):016x}"
     
-    def _create_merkle_record(
-        self, 
+    def _make_record(
+        self,
         event: ComplianceEvent,
+        fidelity: AuditFidelity,
         policy_commitment: Optional[str]
     ) -> AuditRecord:
-        """Create a full audit record with Merkle tree support."""
+        """
+        Create an audit record for the given fidelity level.
+        
+        Every record carries the fidelity and principal; chained and higher
+        levels add the event metadata, and Merkle-proof records are flagged
+        as supporting inclusion proofs.
+        """
+        metadata: Dict[str, Any] = {
+            "fidelity": fidelity.value,
+            "principal": event.principal,
+        }
+        if fidelity is not AuditFidelity.METADATA_ONLY:
+            metadata["event_metadata"] = event.metadata
+        if fidelity is AuditFidelity.MERKLE_PROOF:
+            metadata["supports_merkle_proof"] = True
+        
         return AuditRecord(
-            record_id=str(uuid.uuid4()),
+            record_id=self.new_record_id(),
             event_id=event.event_id,
             timestamp=event.timestamp,
             event_type=event.event_type.value,
@@ -272,12 +269,7 @@ class AdaptiveAuditPipeline:
             bucket=event.bucket,
             object_key=event.object_key,
             policy_commitment=policy_commitment,
-            metadata={
-                "fidelity": AuditFidelity.MERKLE_PROOF.value,
-                "principal": event.principal,
-                "event_metadata": event.metadata,
-                "supports_merkle_proof": True,
-            }
+            metadata=metadata,
         )
     
     def update_configuration(self, config: AuditConfiguration) -> None:
@@ -313,8 +305,7 @@ class AdaptiveAuditPipeline:
             bucket: Bucket name
             fidelity: Audit fidelity level
         """
-        bucket_key = f"{tenant_id}/{bucket}"
-        self.config.bucket_configs[bucket_key] = fidelity
+        self.config.bucket_configs[(tenant_id, bucket)] = fidelity
     
     def get_processed_events(self) -> List[ProcessedAuditEvent]:
         """Get all processed events."""
@@ -327,13 +318,11 @@ class AdaptiveAuditPipeline:
         Returns:
             Dictionary with processing statistics
         """
-        fidelity_counts = {}
-        for processed in self.processed_events:
-            fidelity = processed.fidelity.value
-            fidelity_counts[fidelity] = fidelity_counts.get(fidelity, 0) + 1
-        
         return {
             "total_processed": len(self.processed_events),
-            "fidelity_distribution": fidelity_counts,
+            "fidelity_distribution": {
+                fidelity.value: count
+                for fidelity, count in self._fidelity_counts.items()
+            },
             "ledger_record_count": self.ledger.get_record_count(),
         }
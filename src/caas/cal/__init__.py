@@ -7,13 +7,70 @@ Provides tamper-evident records and efficient inclusion proofs.
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Sequence, Tuple, Callable, Literal
 import hashlib
 import json
 import math
 
+from .._compat import DATACLASS_SLOTS
+from .._encoding import pack_fields
 
-@dataclass
+try:
+    from blake3 import blake3 as _blake3
+except ImportError:  # optional dependency
+    _blake3 = None
+
+
+GENESIS_HASH = "0" * 64
+# Merkle node hashing scheme, recorded in serialized proofs:
+#   1: hash of the two children's concatenated hex strings
+#   2: hash of the two children's concatenated raw 32-byte digests, with
+#      non-hex leaves first hashed to a digest with SHA-256
+MERKLE_SCHEME_VERSION = 2
+# Record hash preimage scheme, recorded in serialized records (ComplianceEvent
+# hashes use the same encoding):
+#   1: key-sorted JSON of the hashed fields (json.dumps defaults)
+#   2: the hashed fields in a fixed order, length-prefixed by pack_fields
+RECORD_HASH_SCHEME_VERSION = 2
+
+
+def _canonical_json(value: Any) -> bytes:
+    """Encode a JSON-compatible value as compact, key-sorted UTF-8 bytes."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+
+
+# Hash functions usable for Merkle aggregation. The record hash chain is
+# always SHA-256; BLAKE3 trades SHA-256 auditability for faster tree builds.
+_MERKLE_HASHES: Dict[str, Callable[[bytes], Any]] = {"sha256": hashlib.sha256}
+if _blake3 is not None:
+    _MERKLE_HASHES["blake3"] = _blake3
+
+
+def _merkle_hash(hash_algo: str) -> Callable[[bytes], Any]:
+    """Resolve a Merkle hash algorithm name to its hashlib-style constructor."""
+    if hash_algo in _MERKLE_HASHES:
+        return _MERKLE_HASHES[hash_algo]
+    if hash_algo == "blake3":
+        raise ImportError("hash_algo='blake3' requires the 'blake3' package")
+    raise ValueError(f"Unsupported Merkle hash algorithm: {hash_algo}")
+
+
+def _to_digest(value: str) -> bytes:
+    """
+    Convert a Merkle leaf or node hash to its raw 32-byte digest.
+    
+    Hex-encoded SHA-256 hashes are decoded directly; any other leaf value
+    is first hashed with SHA-256 so that every tree node is 32 bytes wide.
+    """
+    if len(value) == 64:
+        try:
+            return bytes.fromhex(value)
+        except ValueError:
+            pass
+    return hashlib.sha256(value.encode()).digest()
+
+
+@dataclass(**DATACLASS_SLOTS)
 class AuditRecord:
     """Represents a single audit record."""
     record_id: str
@@ -29,21 +86,35 @@ class AuditRecord:
     record_hash: Optional[str] = None
     
     def compute_hash(self) -> str:
-        """Compute hash of this record."""
-        data = {
-            "record_id": self.record_id,
-            "event_id": self.event_id,
-            "timestamp": self.timestamp.isoformat(),
-            "event_type": self.event_type,
-            "tenant_id": self.tenant_id,
-            "bucket": self.bucket,
-            "object_key": self.object_key,
-            "policy_commitment": self.policy_commitment,
-            "metadata": self.metadata,
-            "previous_hash": self.previous_hash,
-        }
-        json_data = json.dumps(data, sort_keys=True)
-        return hashlib.sha256(json_data.encode()).hexdigest()
+        """Compute hash of this record from its current fields."""
+        return hashlib.sha256(self._canonical_bytes()).hexdigest()
+    
+    def _canonical_bytes(self) -> bytes:
+        """
+        Serialize the hashed fields into the SHA-256 preimage.
+        
+        The canonical form packs the UTF-8 encoding of each field, in the
+        fixed order record_id, event_id, timestamp (ISO 8601), event_type,
+        tenant_id, bucket, object_key, policy_commitment, metadata (compact
+        JSON with sorted keys) and previous_hash, with ``pack_fields`` so
+        field boundaries are unambiguous and absent optional fields differ
+        from empty strings.
+        """
+        object_key = self.object_key
+        policy_commitment = self.policy_commitment
+        previous_hash = self.previous_hash
+        return pack_fields((
+            self.record_id.encode(),
+            self.event_id.encode(),
+            self.timestamp.isoformat().encode(),
+            self.event_type.encode(),
+            self.tenant_id.encode(),
+            self.bucket.encode(),
+            None if object_key is None else object_key.encode(),
+            None if policy_commitment is None else policy_commitment.encode(),
+            _canonical_json(self.metadata),
+            None if previous_hash is None else previous_hash.encode(),
+        ))
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -59,13 +130,16 @@ class AuditRecord:
             "metadata": self.metadata,
             "previous_hash": self.previous_hash,
             "record_hash": self.record_hash,
+            "hash_scheme_version": RECORD_HASH_SCHEME_VERSION,
         }
 
 
 class MerkleNode:
     """Represents a node in a Merkle tree."""
     
-    def __init__(self, hash_value: str, left: Optional['MerkleNode'] = None, 
+    __slots__ = ("hash", "left", "right")
+    
+    def __init__(self, hash_value: bytes, left: Optional['MerkleNode'] = None, 
                  right: Optional['MerkleNode'] = None):
         self.hash = hash_value
         self.left = left
@@ -76,132 +150,256 @@ class MerkleNode:
         return self.left is None and self.right is None
 
 
-@dataclass
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class MerkleProof:
-    """Represents a Merkle inclusion proof."""
+    """
+    Represents a Merkle inclusion proof.
+    
+    Hashes are hex-encoded for serialization; verification works on the
+    raw 32-byte digests so each parent is the SHA-256 of a 64-byte pair.
+    Proofs are immutable because the ledger hands out cached instances.
+    """
     leaf_hash: str
     root_hash: str
-    proof_hashes: List[Tuple[str, str]]  # (hash, position: 'left' or 'right')
+    proof_hashes: Sequence[Tuple[str, str]]  # (hash, position: 'left' or 'right')
+    hash_algo: str = "sha256"
     
     def verify(self) -> bool:
         """Verify the Merkle proof."""
-        current_hash = self.leaf_hash
+        return _fold_proof(self, None)
+
+
+def _fold_proof(proof: MerkleProof, pairs: Optional[Dict[bytes, bytes]]) -> bool:
+    """
+    Hash a proof's sibling path up to the root and compare it.
+    
+    Args:
+        proof: Proof to verify
+        pairs: Memo of node pair -> parent digest shared by proofs that use
+            the same hash algorithm, or None to hash every pair
         
-        for proof_hash, position in self.proof_hashes:
+    Returns:
+        True if the path leads to the proof's root hash
+    """
+    sha256 = _merkle_hash(proof.hash_algo)
+    
+    try:
+        current = _to_digest(proof.leaf_hash)
+        
+        for proof_hash, position in proof.proof_hashes:
+            sibling = bytes.fromhex(proof_hash)
             if position == 'left':
-                combined = proof_hash + current_hash
+                pair = sibling + current
             else:
-                combined = current_hash + proof_hash
+                pair = current + sibling
             
-            current_hash = hashlib.sha256(combined.encode()).hexdigest()
+            if pairs is None:
+                current = sha256(pair).digest()
+            else:
+                # Reuse parents already computed for other proofs
+                parent = pairs.get(pair)
+                if parent is None:
+                    parent = pairs[pair] = sha256(pair).digest()
+                current = parent
+    except ValueError:
+        # Malformed hex in the proof path
+        return False
+    
+    return current == _to_digest(proof.root_hash)
+
+
+def verify_proofs(proofs: List[MerkleProof]) -> List[bool]:
+    """
+    Verify several Merkle proofs, hashing each distinct node pair once.
+    
+    Proofs drawn from the same tree share the upper part of their paths,
+    so a bundle of k proofs from one batch needs about 2k hashes instead
+    of k * log2(batch size).
+    
+    Args:
+        proofs: Proofs to verify
         
-        return current_hash == self.root_hash
+    Returns:
+        Verification result for each proof, in input order
+    """
+    pairs_by_algo: Dict[str, Dict[bytes, bytes]] = {}
+    return [
+        _fold_proof(proof, pairs_by_algo.setdefault(proof.hash_algo, {}))
+        for proof in proofs
+    ]
 
 
 class MerkleTree:
-    """Merkle tree implementation for efficient inclusion proofs."""
+    """
+    Merkle tree implementation for efficient inclusion proofs.
+    
+    The tree grows incrementally: each parent is hashed exactly once, when
+    its right child is completed. Nodes on the right spine of a partially
+    filled tree (where an odd last node is paired with itself) are derived
+    on demand, so the root and proofs are available for any number of
+    leaves.
+    """
     
-    def __init__(self, leaves: List[str]):
+    def __init__(self, leaves: List[str], hash_algo: str = "sha256"):
         """
         Build a Merkle tree from leaf hashes.
         
         Args:
             leaves: List of leaf hash values
+            hash_algo: Node hash algorithm, "sha256" or "blake3"
         """
-        self.leaves = leaves
-        self.root = self._build_tree(leaves)
+        self.leaves: List[str] = list(leaves)
+        self.hash_algo = hash_algo
+        self._hash = _merkle_hash(hash_algo)
+        # levels[k] holds the level-k nodes whose subtrees are complete;
+        # levels[0] holds the leaf digests
+        self.levels: List[List[bytes]] = self._build_tree([_to_digest(h) for h in leaves])
+        self._spine: Optional[List[Optional[bytes]]] = None
+        
+        # Leaf hash -> position of its first occurrence
+        self._leaf_index: Dict[str, int] = {}
+        for i, leaf in enumerate(leaves):
+            self._leaf_index.setdefault(leaf, i)
     
-    def _build_tree(self, hashes: List[str]) -> Optional[MerkleNode]:
-        """Build Merkle tree from list of hashes."""
-        if not hashes:
-            return None
+    def _build_tree(self, digests: List[bytes]) -> List[List[bytes]]:
+        """Hash every complete pair bottom-up into per-level digest lists."""
+        if not digests:
+            return []
         
-        if len(hashes) == 1:
-            return MerkleNode(hashes[0])
+        node_hash = self._hash
+        levels = [digests]
+        current = digests
         
-        # Build current level
-        nodes = [MerkleNode(h) for h in hashes]
+        while len(current) > 1:
+            current = [
+                node_hash(current[i] + current[i + 1]).digest()
+                for i in range(0, len(current) - 1, 2)
+            ]
+            levels.append(current)
         
-        # Build tree bottom-up
-        while len(nodes) > 1:
-            next_level = []
+        return levels
+    
+    def append(self, leaf_hash: str) -> None:
+        """
+        Add a leaf to the tree.
+        
+        Hashes one parent per completed pair, i.e. amortized O(1) per leaf.
+        
+        Args:
+            leaf_hash: Leaf hash value
+        """
+        self._leaf_index.setdefault(leaf_hash, len(self.leaves))
+        self.leaves.append(leaf_hash)
+        self._spine = None
+        
+        levels = self.levels
+        if not levels:
+            levels.append([])
+        
+        node = _to_digest(leaf_hash)
+        level = 0
+        while True:
+            nodes = levels[level]
+            nodes.append(node)
+            if len(nodes) % 2:
+                break
+            node = self._hash(nodes[-2] + node).digest()
+            level += 1
+            if level == len(levels):
+                levels.append([])
+    
+    def _right_spine(self) -> List[Optional[bytes]]:
+        """
+        Derive the nodes on the right spine that are not yet complete.
+        
+        Entry k is the extra level-k node, or None when level k holds only
+        complete nodes; the last entry's level is the root level.
+        """
+        if self._spine is not None:
+            return self._spine
+        
+        node_hash = self._hash
+        levels = self.levels
+        spine: List[Optional[bytes]] = [None]
+        level = 0
+        
+        while True:
+            complete = levels[level] if level < len(levels) else []
+            carry = spine[level]
+            if len(complete) + (carry is not None) <= 1:
+                break
             
-            for i in range(0, len(nodes), 2):
-                left = nodes[i]
-                
-                if i + 1 < len(nodes):
-                    right = nodes[i + 1]
-                else:
-                    # Duplicate last node if odd number
-                    right = nodes[i]
-                
-                # Combine hashes
-                combined = left.hash + right.hash
-                parent_hash = hashlib.sha256(combined.encode()).hexdigest()
-                parent = MerkleNode(parent_hash, left, right)
-                next_level.append(parent)
+            # Nodes left over after the pairs already hashed into level + 1
+            paired = 2 * len(levels[level + 1]) if level + 1 < len(levels) else 0
+            rest = complete[paired:]
+            if carry is not None:
+                rest = rest + [carry]
             
-            nodes = next_level
+            if not rest:
+                spine.append(None)
+            elif len(rest) == 1:
+                # Duplicate last node if odd number
+                spine.append(node_hash(rest[0] + rest[0]).digest())
+            else:
+                spine.append(node_hash(rest[0] + rest[1]).digest())
+            level += 1
         
-        return nodes[0]
+        self._spine = spine
+        return spine
     
     def get_root_hash(self) -> str:
         """Get the Merkle root hash."""
-        return self.root.hash if self.root else ""
+        if not self.leaves:
+            return ""
+        if len(self.leaves) == 1:
+            # A lone leaf is its own root
+            return self.leaves[0]
+        
+        spine = self._right_spine()
+        top = len(spine) - 1
+        complete = self.levels[top] if top < len(self.levels) else []
+        root = complete[0] if complete else spine[top]
+        return root.hex()
     
     def generate_proof(self, leaf_hash: str) -> Optional[MerkleProof]:
         """
         Generate a Merkle inclusion proof for a leaf.
         
+        The sibling path is read from the stored levels and the right
+        spine, so at most O(log N) hashes are needed (for the spine).
+        
         Args:
             leaf_hash: Hash of the leaf to prove
             
         Returns:
             MerkleProof if leaf exists, None otherwise
         """
-        if leaf_hash not in self.leaves:
+        index = self._leaf_index.get(leaf_hash)
+        if index is None:
             return None
         
-        leaf_index = self.leaves.index(leaf_hash)
+        spine = self._right_spine()
         proof_hashes = []
         
-        # Get proof path
-        current_level = [MerkleNode(h) for h in self.leaves]
-        current_index = leaf_index
-        
-        while len(current_level) > 1:
-            next_level = []
+        for level in range(len(spine) - 1):
+            complete = self.levels[level]
+            count = len(complete) + (spine[level] is not None)
             
-            for i in range(0, len(current_level), 2):
-                left = current_level[i]
-                
-                if i + 1 < len(current_level):
-                    right = current_level[i + 1]
-                else:
-                    right = current_level[i]
-                
-                # If current node is part of the proof path
-                if i == current_index or i + 1 == current_index:
-                    if i == current_index:
-                        # Current is left, need right sibling
-                        if i + 1 < len(current_level) and right != left:
-                            proof_hashes.append((right.hash, 'right'))
-                        current_index = i // 2
-                    else:
-                        # Current is right, need left sibling
-                        proof_hashes.append((left.hash, 'left'))
-                        current_index = i // 2
-                
-                combined = left.hash + right.hash
-                parent_hash = hashlib.sha256(combined.encode()).hexdigest()
-                next_level.append(MerkleNode(parent_hash, left, right))
+            sibling = index ^ 1
+            if sibling >= count:
+                # Odd node was paired with itself
+                sibling = index
             
-            current_level = next_level
+            node = complete[sibling] if sibling < len(complete) else spine[level]
+            position = 'left' if sibling < index else 'right'
+            proof_hashes.append((node.hex(), position))
+            index >>= 1
         
         return MerkleProof(
             leaf_hash=leaf_hash,
             root_hash=self.get_root_hash(),
-            proof_hashes=proof_hashes
+            proof_hashes=tuple(proof_hashes),
+            hash_algo=self.hash_algo,
         )
 
 
@@ -211,15 +409,29 @@ class AuditLedger:
     
     The ledger:
     1. Maintains hash chain for sequential integrity
-    2. Builds Merkle trees for efficient inclusion proofs
+    2. Grows a Merkle tree per batch of records for efficient inclusion proofs
     3. Provides tamper-evident guarantees
     """
     
-    def __init__(self):
+    def __init__(self, hash_algo: Literal["sha256", "blake3"] = "sha256"):
+        """
+        Initialize the audit ledger.
+        
+        Args:
+            hash_algo: Hash used for Merkle aggregation. The record hash
+                chain always uses SHA-256; "blake3" builds trees faster but
+                proofs then need a BLAKE3 implementation to verify.
+        """
+        _merkle_hash(hash_algo)  # Fail fast on unknown or unavailable algorithms
+        self.hash_algo = hash_algo
         self.records: List[AuditRecord] = []
         self.record_index: Dict[str, int] = {}  # record_id -> index
-        self.merkle_trees: List[MerkleTree] = []  # Periodic Merkle trees
-        self.tree_batch_size = 100  # Build tree every N records
+        self.merkle_trees: List[MerkleTree] = []  # Completed batch trees
+        self.tree_batch_size = 100  # Seal a tree every N records
+        self._open_tree = MerkleTree([], hash_algo)  # Batch being filled
+        self._verified_upto = 0  # Records [0, _verified_upto) passed verification
+        self._verified_head: Optional[str] = None  # record_hash at the watermark
+        self._proof_cache: Dict[int, MerkleProof] = {}  # position -> proof in a sealed tree
     
     def append(self, record: AuditRecord) -> str:
         """
@@ -235,7 +447,7 @@ class AuditLedger:
         if self.records:
             record.previous_hash = self.records[-1].record_hash
         else:
-            record.previous_hash = "0" * 64  # Genesis hash
+            record.previous_hash = GENESIS_HASH
         
         # Compute and set record hash
         record.record_hash = record.compute_hash()
@@ -244,22 +456,50 @@ class AuditLedger:
         self.records.append(record)
         self.record_index[record.record_id] = len(self.records) - 1
         
-        # Build Merkle tree if batch is complete
-        if len(self.records) % self.tree_batch_size == 0:
-            self._build_merkle_tree()
+        # Add to the current batch's Merkle tree
+        self._add_merkle_leaf(record.record_hash)
         
         return record.record_hash
     
-    def _build_merkle_tree(self) -> None:
-        """Build a Merkle tree for the latest batch of records."""
-        start_idx = len(self.merkle_trees) * self.tree_batch_size
-        end_idx = start_idx + self.tree_batch_size
+    def append_batch(self, records: List[AuditRecord]) -> List[str]:
+        """
+        Append several records to the ledger in one pass.
         
-        batch_records = self.records[start_idx:end_idx]
-        leaf_hashes = [r.record_hash for r in batch_records]
+        Equivalent to calling ``append`` for each record in order, but keeps
+        the chain head and ledger containers in locals across the batch.
         
-        tree = MerkleTree(leaf_hashes)
-        self.merkle_trees.append(tree)
+        Args:
+            records: Audit records to append, in chain order
+            
+        Returns:
+            Hashes of the appended records
+        """
+        ledger_records = self.records
+        record_index = self.record_index
+        add_merkle_leaf = self._add_merkle_leaf
+        
+        previous_hash = ledger_records[-1].record_hash if ledger_records else GENESIS_HASH
+        hashes = []
+        
+        for record in records:
+            record.previous_hash = previous_hash
+            previous_hash = record.record_hash = record.compute_hash()
+            
+            record_index[record.record_id] = len(ledger_records)
+            ledger_records.append(record)
+            hashes.append(previous_hash)
+            add_merkle_leaf(previous_hash)
+        
+        return hashes
+    
+    def _add_merkle_leaf(self, record_hash: str) -> None:
+        """Add a record hash to the open batch tree, sealing it when full."""
+        tree = self._open_tree
+        tree.append(record_hash)
+        
+        if len(tree.leaves) >= self.tree_batch_size:
+            self.merkle_trees.append(tree)
+            self._open_tree = MerkleTree([], self.hash_algo)
     
     def get_record(self, record_id: str) -> Optional[AuditRecord]:
         """
@@ -276,54 +516,118 @@ class AuditLedger:
             return self.records[idx]
         return None
     
-    def verify_chain_integrity(self) -> bool:
+    def verify_chain_integrity(self, full: bool = False) -> bool:
         """
         Verify the integrity of the hash chain.
         
+        Note:
+            By default only records appended since the last successful
+            check are verified. Records below that watermark are trusted,
+            so editing them in place is NOT detected unless the chain head
+            at the watermark changed. Use ``full=True`` (or call
+            ``invalidate_cache`` first) for audits and whenever in-place
+            tampering must be ruled out. Removing records that were already
+            verified always fails the check.
+        
+        Args:
+            full: Re-verify every record from the genesis record
+            
         Returns:
             True if chain is intact, False if tampered
         """
-        for i, record in enumerate(self.records):
-            # Check hash computation
-            expected_hash = record.compute_hash()
-            if record.record_hash != expected_hash:
+        records = self.records
+        start = self._verified_upto
+        
+        # The ledger is append-only, so losing verified records is tampering
+        if start > len(records):
+            return False
+        
+        if full or (start and records[start - 1].record_hash != self._verified_head):
+            start = 0
+        
+        previous_hash = records[start - 1].record_hash if start else GENESIS_HASH
+        
+        for i in range(start, len(records)):
+            record = records[i]
+            
+            # Check chain link against the previous record (or genesis)
+            if record.previous_hash != previous_hash:
                 return False
             
-            # Check chain link
-            if i > 0:
-                if record.previous_hash != self.records[i - 1].record_hash:
-                    return False
-            else:
-                if record.previous_hash != "0" * 64:
-                    return False
+            # Check hash computation from the record's current fields
+            previous_hash = record.record_hash
+            if previous_hash != record.compute_hash():
+                return False
         
+        self._verified_upto = len(records)
+        self._verified_head = previous_hash if records else None
         return True
     
+    def invalidate_cache(self) -> None:
+        """Forget previous verification so the next check covers every record."""
+        self._verified_upto = 0
+        self._verified_head = None
+    
     def generate_inclusion_proof(self, record_id: str) -> Optional[MerkleProof]:
         """
         Generate a Merkle inclusion proof for a record.
         
+        Records in the batch that is still being filled are proven against
+        that batch's current root, which changes as more records arrive.
+        Proofs against sealed batches never change and are cached, so the
+        same MerkleProof object is returned on repeated calls.
+        
         Args:
             record_id: Record identifier
             
         Returns:
-            MerkleProof if record exists and is in a completed batch
+            MerkleProof if record exists, None otherwise
         """
         idx = self.record_index.get(record_id)
         if idx is None:
             return None
+        return self._proof_at(idx)
+    
+    def generate_inclusion_proofs(self, record_ids: List[str]) -> List[MerkleProof]:
+        """
+        Generate Merkle inclusion proofs for several records.
+        
+        Args:
+            record_ids: Record identifiers
+            
+        Returns:
+            MerkleProof for each record that exists, in input order
+        """
+        record_index = self.record_index
+        proof_at = self._proof_at
+        proofs = []
+        
+        for record_id in record_ids:
+            idx = record_index.get(record_id)
+            if idx is not None:
+                proof = proof_at(idx)
+                if proof is not None:
+                    proofs.append(proof)
+        
+        return proofs
+    
+    def _proof_at(self, idx: int) -> Optional[MerkleProof]:
+        """Prove the record at ledger position idx, caching sealed-batch proofs."""
+        proof = self._proof_cache.get(idx)
+        if proof is not None:
+            return proof
         
         # Find which tree contains this record
         tree_index = idx // self.tree_batch_size
+        record_hash = self.records[idx].record_hash
         
         if tree_index >= len(self.merkle_trees):
-            # Record not yet in a completed Merkle tree
-            return None
-        
-        record = self.records[idx]
-        tree = self.merkle_trees[tree_index]
+            return self._open_tree.generate_proof(record_hash)
         
-        return tree.generate_proof(record.record_hash)
+        proof = self.merkle_trees[tree_index].generate_proof(record_hash)
+        if proof is not None:
+            self._proof_cache[idx] = proof
+        return proof
     
     def get_record_count(self) -> int:
         """Get total number of records in the ledger."""
@@ -5,13 +5,22 @@ Intercepts compliance-relevant events before state mutation in the object storag
 Ensures completeness by capturing all mutation events.
 """
 
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional, Callable
-from queue import Queue, Empty
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple, Union
+from queue import Queue, Empty, Full
 import json
 import hashlib
+import logging
+import sys
+
+from .._compat import DATACLASS_SLOTS
+from .._encoding import pack_fields
+
+
+logger = logging.getLogger(__name__)
 
 
 class EventType(Enum):
@@ -25,7 +34,7 @@ class EventType(Enum):
     POLICY_DELETE = "policy.delete"
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ComplianceEvent:
     """Represents a compliance-relevant event."""
     event_id: str
@@ -52,8 +61,30 @@ class ComplianceEvent:
     
     def compute_hash(self) -> str:
         """Compute cryptographic hash of the event."""
-        event_data = json.dumps(self.to_dict(), sort_keys=True)
-        return hashlib.sha256(event_data.encode()).hexdigest()
+        return hashlib.sha256(self._canonical_bytes()).hexdigest()
+    
+    def _canonical_bytes(self) -> bytes:
+        """
+        Serialize the event into the SHA-256 preimage.
+        
+        The canonical form packs the UTF-8 encoding of each field, in the
+        fixed order event_id, event_type, timestamp (ISO 8601), tenant_id,
+        bucket, object_key, principal and metadata (compact JSON with sorted
+        keys), with ``pack_fields`` so field boundaries are unambiguous and
+        absent optional fields differ from empty strings.
+        """
+        object_key = self.object_key
+        principal = self.principal
+        return pack_fields((
+            self.event_id.encode(),
+            self.event_type.value.encode(),
+            self.timestamp.isoformat().encode(),
+            self.tenant_id.encode(),
+            self.bucket.encode(),
+            None if object_key is None else object_key.encode(),
+            None if principal is None else principal.encode(),
+            json.dumps(self.metadata, sort_keys=True, separators=(",", ":")).encode(),
+        ))
 
 
 class EventInterceptor:
@@ -64,17 +95,31 @@ class EventInterceptor:
     cause state mutations in the object storage system.
     """
     
-    def __init__(self, max_queue_size: int = 10000):
+    def __init__(self, max_queue_size: int = 10000, fast_path: bool = False):
         """
         Initialize the event interceptor.
         
         Args:
-            max_queue_size: Maximum number of events to queue
+            max_queue_size: Maximum number of events to queue (also bounds
+                the window of recently intercepted events that is retained)
+            fast_path: Back the queue with a deque instead of a thread-safe
+                blocking ``Queue``. Only for single-threaded use: the size
+                bound is not enforced atomically against concurrent
+                producers, and ``get_event`` never blocks.
         """
-        self.event_queue: Queue = Queue(maxsize=max_queue_size)
+        self.max_queue_size = max_queue_size
+        self.fast_path = fast_path
+        self.event_queue: Union[Queue, Deque[ComplianceEvent]] = (
+            deque() if fast_path else Queue(maxsize=max_queue_size)
+        )
         self.handlers: List[Callable[[ComplianceEvent], None]] = []
+        # Immutable snapshot iterated on the hot path; rebuilt on registration
+        self._handlers_tuple: Tuple[Callable[[ComplianceEvent], None], ...] = ()
         self._event_count = 0
-        self._intercepted_events: List[ComplianceEvent] = []
+        # As with Queue, a size of zero or less means unbounded
+        self._recent_events: Deque[ComplianceEvent] = deque(
+            maxlen=max_queue_size if max_queue_size > 0 else None
+        )
     
     def register_handler(self, handler: Callable[[ComplianceEvent], None]) -> None:
         """
@@ -84,6 +129,16 @@ class EventInterceptor:
             handler: Callback function that receives ComplianceEvent
         """
         self.handlers.append(handler)
+        self._handlers_tuple = tuple(self.handlers)
+    
+    def _dispatch(self, event: ComplianceEvent) -> None:
+        """Call every registered handler, isolating handler failures."""
+        for handler in self._handlers_tuple:
+            try:
+                handler(event)
+            except Exception:
+                # Log error but continue with the remaining handlers
+                logger.exception("Handler error for event %s", event.event_id)
     
     def intercept(self, event: ComplianceEvent) -> bool:
         """
@@ -96,37 +151,102 @@ class EventInterceptor:
             True if event was successfully intercepted, False otherwise
         """
         try:
+            # Intern routing keys so repeated values share one object
+            event.tenant_id = sys.intern(event.tenant_id)
+            event.bucket = sys.intern(event.bucket)
+            
             # Add to queue for processing
-            self.event_queue.put(event, block=False)
+            if self.fast_path:
+                if 0 < self.max_queue_size <= len(self.event_queue):
+                    raise Full
+                self.event_queue.append(event)
+            else:
+                self.event_queue.put(event, block=False)
             
             # Keep track for completeness verification
-            self._intercepted_events.append(event)
+            self._recent_events.append(event)
             self._event_count += 1
             
-            # Call registered handlers
-            for handler in self.handlers:
-                try:
-                    handler(event)
-                except Exception as e:
-                    # Log error but continue processing
-                    print(f"Handler error: {e}")
-            
-            return True
-            
-        except Exception as e:
-            print(f"Failed to intercept event: {e}")
+        except Exception:
+            logger.exception("Failed to intercept event %s", event.event_id)
             return False
+        
+        # Call registered handlers
+        self._dispatch(event)
+        return True
+    
+    def batch_intercept(self, events: List[ComplianceEvent]) -> int:
+        """
+        Intercept several events at once.
+        
+        Events are enqueued in order until the queue is full; any
+        remaining events are rejected. Malformed events are logged and
+        skipped, as ``intercept`` would reject them.
+        
+        Args:
+            events: The compliance events to intercept
+            
+        Returns:
+            Number of events that were successfully intercepted
+        """
+        # Intern routing keys, skipping malformed events as intercept() does
+        intern = sys.intern
+        valid = []
+        for event in events:
+            try:
+                event.tenant_id = intern(event.tenant_id)
+                event.bucket = intern(event.bucket)
+            except Exception:
+                logger.exception("Failed to intercept event %s", event.event_id)
+                continue
+            valid.append(event)
+        
+        queue = self.event_queue
+        if self.fast_path:
+            if self.max_queue_size > 0:
+                accepted = valid[:max(0, self.max_queue_size - len(queue))]
+            else:
+                accepted = valid
+            queue.extend(accepted)
+        else:
+            accepted = []
+            for event in valid:
+                try:
+                    queue.put_nowait(event)
+                except Full:
+                    break
+                accepted.append(event)
+        
+        if len(accepted) < len(valid):
+            logger.warning(
+                "Event queue full: rejected %d of %d events",
+                len(valid) - len(accepted), len(events),
+            )
+        
+        self._recent_events.extend(accepted)
+        self._event_count += len(accepted)
+        
+        for event in accepted:
+            self._dispatch(event)
+        return len(accepted)
     
     def get_event(self, timeout: Optional[float] = None) -> Optional[ComplianceEvent]:
         """
         Retrieve an event from the queue.
         
         Args:
-            timeout: Maximum time to wait for an event (None = non-blocking)
+            timeout: Maximum time to wait for an event (None = non-blocking).
+                Ignored on the fast path, which never blocks.
             
         Returns:
             ComplianceEvent if available, None otherwise
         """
+        if self.fast_path:
+            try:
+                return self.event_queue.popleft()
+            except IndexError:
+                return None
+        
         try:
             return self.event_queue.get(block=timeout is not None, timeout=timeout)
         except Empty:
@@ -149,29 +269,34 @@ class EventInterceptor:
         return self._event_count == expected_count
     
     def get_intercepted_events(self) -> List[ComplianceEvent]:
-        """Get list of all intercepted events."""
-        return self._intercepted_events.copy()
+        """
+        Get the most recently intercepted events.
+        
+        Only the last ``max_queue_size`` events are retained; use
+        ``get_event_count`` for the total number intercepted.
+        """
+        return list(self._recent_events)
 
 
 class EventFilter:
     """Filters events based on criteria."""
     
     def __init__(self):
-        self.tenant_filters: List[str] = []
-        self.bucket_filters: List[str] = []
-        self.event_type_filters: List[EventType] = []
+        self.tenant_filters: Set[str] = set()
+        self.bucket_filters: Set[str] = set()
+        self.event_type_filters: Set[EventType] = set()
     
     def add_tenant_filter(self, tenant_id: str) -> None:
         """Filter events by tenant ID."""
-        self.tenant_filters.append(tenant_id)
+        self.tenant_filters.add(sys.intern(tenant_id))
     
     def add_bucket_filter(self, bucket: str) -> None:
         """Filter events by bucket."""
-        self.bucket_filters.append(bucket)
+        self.bucket_filters.add(sys.intern(bucket))
     
     def add_event_type_filter(self, event_type: EventType) -> None:
         """Filter events by type."""
-        self.event_type_filters.append(event_type)
+        self.event_type_filters.add(event_type)
     
     def matches(self, event: ComplianceEvent) -> bool:
         """
@@ -183,13 +308,14 @@ class EventFilter:
         Returns:
             True if event matches all active filters
         """
-        if self.tenant_filters and event.tenant_id not in self.tenant_filters:
+        # Event type first: it is usually the most selective criterion
+        if self.event_type_filters and event.event_type not in self.event_type_filters:
             return False
         
-        if self.bucket_filters and event.bucket not in self.bucket_filters:
+        if self.tenant_filters and event.tenant_id not in self.tenant_filters:
             return False
         
-        if self.event_type_filters and event.event_type not in self.event_type_filters:
+        if self.bucket_filters and event.bucket not in self.bucket_filters:
             return False
         
         return True
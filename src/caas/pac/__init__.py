@@ -7,10 +7,20 @@ calculating cryptographic commitments bound to audit records.
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import json
 import hashlib
 from enum import Enum
+from json.encoder import encode_basestring_ascii as _quote
+from operator import attrgetter, itemgetter
+
+from .._compat import DATACLASS_SLOTS
+
+
+# Shared encoder for canonical forms; json.dumps() would build a new
+# encoder per call for non-default options. Output is identical to
+# json.dumps(value, sort_keys=True).
+_CANONICAL_ENCODER = json.JSONEncoder(sort_keys=True)
 
 
 class PolicyEffect(Enum):
@@ -28,7 +38,11 @@ class PolicyAction(Enum):
     ALL = "s3:*"
 
 
-@dataclass
+_BY_SID = itemgetter("Sid")
+_SID = attrgetter("sid")
+
+
+@dataclass(**DATACLASS_SLOTS)
 class PolicyStatement:
     """Represents a single policy statement."""
     sid: str
@@ -50,7 +64,7 @@ class PolicyStatement:
         }
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Policy:
     """Represents a compliance policy."""
     policy_id: str
@@ -70,7 +84,7 @@ class Policy:
         }
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class CanonicalPolicy:
     """Represents a canonicalized policy."""
     policy_id: str
@@ -91,6 +105,46 @@ class CanonicalPolicy:
         }
 
 
+def _encode_string_list(values: List[str]) -> str:
+    """Encode a list of strings as a JSON array."""
+    return "[" + ", ".join(map(_quote, values)) + "]"
+
+
+def _encode_canonical(policy: Policy) -> str:
+    """
+    Encode a policy's canonical form without building the normalized dict.
+    
+    Writes the normalized structure's fields directly, in sorted key order,
+    so the result is identical to encoding ``_normalize_policy(policy)``
+    with ``_CANONICAL_ENCODER``. Raises TypeError for string fields that
+    hold non-string values.
+    """
+    statements = []
+    
+    # Statements ordered by Sid (stable, as in _normalize_policy)
+    for stmt in sorted(policy.statements, key=_SID):
+        actions = [action.value for action in stmt.actions]
+        actions.sort()
+        
+        fields = ['"Actions": ' + _encode_string_list(actions)]
+        if stmt.conditions:
+            fields.append('"Conditions": ' + _CANONICAL_ENCODER.encode(stmt.conditions))
+        fields.append('"Effect": ' + _quote(stmt.effect.value))
+        if stmt.principals:
+            fields.append('"Principals": ' + _encode_string_list(sorted(stmt.principals)))
+        fields.append('"Resources": ' + _encode_string_list(sorted(stmt.resources)))
+        fields.append('"Sid": ' + _quote(stmt.sid))
+        
+        statements.append("{" + ", ".join(fields) + "}")
+    
+    return (
+        '{"Name": ' + _quote(policy.name)
+        + ', "PolicyId": ' + _quote(policy.policy_id)
+        + ', "Statements": [' + ", ".join(statements)
+        + '], "Version": ' + _quote(policy.version) + "}"
+    )
+
+
 class PolicyCompiler:
     """
     Compiles policies into canonical form with cryptographic commitments.
@@ -100,10 +154,15 @@ class PolicyCompiler:
     2. Eliminates semantic ambiguities
     3. Assigns version numbers
     4. Calculates cryptographic commitments (hashes)
+    
+    Recompiling a policy version whose canonical form is unchanged returns
+    the cached result; a policy edited since it was compiled, even in
+    place, is compiled and recorded again.
     """
     
     def __init__(self):
-        self.compiled_policies: Dict[str, CanonicalPolicy] = {}
+        self.compiled_policies: Dict[str, CanonicalPolicy] = {}  # latest per policy_id
+        self.compiled_versions: Dict[Tuple[str, str], CanonicalPolicy] = {}
         self.policy_versions: Dict[str, List[str]] = {}  # policy_id -> list of versions
     
     def compile(self, policy: Policy) -> CanonicalPolicy:
@@ -116,27 +175,104 @@ class PolicyCompiler:
         Returns:
             CanonicalPolicy with cryptographic commitment
         """
-        # Normalize policy structure
-        normalized = self._normalize_policy(policy)
-        
         # Generate canonical form (deterministic JSON)
-        canonical_form = json.dumps(normalized, sort_keys=True, indent=None)
+        canonical_form = self._canonical_form(policy)
+        
+        cached = self._lookup_compiled(policy, canonical_form)
+        if cached is not None:
+            return cached
         
         # Calculate cryptographic commitment
         commitment_hash = self._calculate_commitment(canonical_form)
         
-        # Create canonical policy
+        return self._register(policy, canonical_form, commitment_hash, datetime.utcnow())
+    
+    def compile_many(self, policies: List[Policy]) -> List[CanonicalPolicy]:
+        """
+        Compile several policies in one call.
+        
+        Equivalent to calling ``compile`` for each policy in order, but runs
+        serialization and hashing as separate passes over the
+        batch and stamps every result with the same creation time.
+        
+        Args:
+            policies: Policies to compile
+            
+        Returns:
+            CanonicalPolicy for each policy, in input order
+        """
+        canonical_form = self._canonical_form
+        forms = [canonical_form(policy) for policy in policies]
+        
+        lookup_compiled = self._lookup_compiled
+        results: List[Optional[CanonicalPolicy]] = [
+            lookup_compiled(policy, form) for policy, form in zip(policies, forms)
+        ]
+        
+        # Compile each uncached policy version once, however often it repeats
+        pending: List[Policy] = []
+        canonical_forms: List[str] = []
+        pending_index: Dict[Tuple[str, str, str], int] = {}
+        for policy, form, result in zip(policies, forms, results):
+            key = (policy.policy_id, policy.version, form)
+            if result is None and key not in pending_index:
+                pending_index[key] = len(pending)
+                pending.append(policy)
+                canonical_forms.append(form)
+        
+        calculate_commitment = self._calculate_commitment
+        commitments = [calculate_commitment(form) for form in canonical_forms]
+        
+        created_at = datetime.utcnow()
+        compiled = [
+            self._register(policy, form, commitment, created_at)
+            for policy, form, commitment in zip(pending, canonical_forms, commitments)
+        ]
+        compiled_policies = [
+            result if result is not None
+            else compiled[pending_index[(policy.policy_id, policy.version, form)]]
+            for policy, form, result in zip(policies, forms, results)
+        ]
+        
+        # Later entries win, as with successive compile() calls
+        for canonical_policy in compiled_policies:
+            self.compiled_policies[canonical_policy.policy_id] = canonical_policy
+        
+        return compiled_policies
+    
+    def _lookup_compiled(
+        self,
+        policy: Policy,
+        canonical_form: str
+    ) -> Optional[CanonicalPolicy]:
+        """Return the cached compilation of this policy version if it is unchanged."""
+        cached = self.compiled_versions.get((policy.policy_id, policy.version))
+        if cached is None or cached.canonical_form != canonical_form:
+            return None
+        
+        self.compiled_policies[policy.policy_id] = cached
+        return cached
+    
+    def _register(
+        self,
+        policy: Policy,
+        canonical_form: str,
+        commitment_hash: str,
+        created_at: datetime
+    ) -> CanonicalPolicy:
+        """Create a CanonicalPolicy and record it as the latest version."""
         canonical_policy = CanonicalPolicy(
             policy_id=policy.policy_id,
             version=policy.version,
             canonical_form=canonical_form,
             commitment_hash=commitment_hash,
-            created_at=datetime.utcnow(),
+            created_at=created_at,
             original_policy=policy,
         )
         
         # Store compiled policy
         self.compiled_policies[policy.policy_id] = canonical_policy
+        self.compiled_versions[(policy.policy_id, policy.version)] = canonical_policy
         
         # Track versions
         if policy.policy_id not in self.policy_versions:
@@ -145,6 +281,24 @@ class PolicyCompiler:
         
         return canonical_policy
     
+    def _canonical_form(self, policy: Policy) -> str:
+        """
+        Serialize a policy to its canonical JSON form.
+        
+        Uses the schema-specialized encoder, falling back to normalizing
+        and encoding generically for values outside the declared types.
+        
+        Args:
+            policy: Policy to serialize
+            
+        Returns:
+            Canonical JSON string
+        """
+        try:
+            return _encode_canonical(policy)
+        except TypeError:
+            return _CANONICAL_ENCODER.encode(self._normalize_policy(policy))
+    
     def _normalize_policy(self, policy: Policy) -> Dict[str, Any]:
         """
         Normalize policy structure to eliminate ambiguities.
@@ -155,46 +309,51 @@ class PolicyCompiler:
         Returns:
             Normalized policy dictionary
         """
-        normalized = {
-            "PolicyId": policy.policy_id,
-            "Version": policy.version,
-            "Name": policy.name,
-            "Statements": [],
-        }
+        statements = []
         
         # Normalize each statement
         for stmt in policy.statements:
+            actions = [action.value for action in stmt.actions]
+            actions.sort()
+            resources = list(stmt.resources)
+            resources.sort()
+            
             normalized_stmt = {
                 "Sid": stmt.sid,
                 "Effect": stmt.effect.value,
-                "Actions": sorted([action.value for action in stmt.actions]),
-                "Resources": sorted(stmt.resources),
+                "Actions": actions,
+                "Resources": resources,
             }
             
             # Add optional fields if present
             if stmt.principals:
-                normalized_stmt["Principals"] = sorted(stmt.principals)
+                principals = list(stmt.principals)
+                principals.sort()
+                normalized_stmt["Principals"] = principals
             
             if stmt.conditions:
                 # Normalize conditions (sort keys)
-                normalized_stmt["Conditions"] = {
-                    k: stmt.conditions[k] for k in sorted(stmt.conditions.keys())
-                }
+                normalized_stmt["Conditions"] = dict(sorted(stmt.conditions.items()))
             
-            normalized["Statements"].append(normalized_stmt)
+            statements.append(normalized_stmt)
         
         # Sort statements by Sid for deterministic ordering
-        normalized["Statements"] = sorted(
-            normalized["Statements"], 
-            key=lambda x: x["Sid"]
-        )
+        statements.sort(key=_BY_SID)
         
-        return normalized
+        return {
+            "PolicyId": policy.policy_id,
+            "Version": policy.version,
+            "Name": policy.name,
+            "Statements": statements,
+        }
     
     def _calculate_commitment(self, canonical_form: str) -> str:
         """
         Calculate cryptographic commitment (hash) for the canonical form.
         
+        hashlib delegates to OpenSSL, which already selects the SHA
+        extensions (SHA-NI) at runtime on CPUs that support them.
+        
         Args:
             canonical_form: Canonical JSON string
             
@@ -203,16 +362,23 @@ class PolicyCompiler:
         """
         return hashlib.sha256(canonical_form.encode()).hexdigest()
     
-    def get_policy(self, policy_id: str) -> Optional[CanonicalPolicy]:
+    def get_policy(
+        self,
+        policy_id: str,
+        version: Optional[str] = None
+    ) -> Optional[CanonicalPolicy]:
         """
         Retrieve a compiled policy by ID.
         
         Args:
             policy_id: Policy identifier
+            version: Specific version to retrieve (latest compiled if omitted)
             
         Returns:
             CanonicalPolicy if found, None otherwise
         """
+        if version is not None:
+            return self.compiled_versions.get((policy_id, version))
         return self.compiled_policies.get(policy_id)
     
     def get_policy_versions(self, policy_id: str) -> List[str]:
@@ -5,15 +5,35 @@ Produces Compliance Proof Bundles (CPBs) for offline validation by third-party a
 Includes audit records, policy commitments, Merkle proofs, and anchoring references.
 """
 
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-import json
+from typing import List, Dict, Any, Iterator, Optional, TextIO, Tuple
 from enum import Enum
+from functools import wraps
+from operator import attrgetter
+from time import time_ns
+import itertools
 
-from ..cal import AuditRecord, AuditLedger, MerkleProof
+from ..cal import (
+    MERKLE_SCHEME_VERSION, AuditRecord, AuditLedger, MerkleProof, verify_proofs
+)
 from ..pac import CanonicalPolicy, PolicyCompiler
 from ..aap import ProcessedAuditEvent
+from .._compat import DATACLASS_SLOTS, json_dumps
+
+
+def _proof_to_dict(proof: MerkleProof) -> Dict[str, Any]:
+    """Convert a Merkle proof to its bundle dictionary form."""
+    return {
+        "leaf_hash": proof.leaf_hash,
+        "root_hash": proof.root_hash,
+        "proof_hashes": proof.proof_hashes,
+        "hash_algo": proof.hash_algo,
+        "scheme_version": MERKLE_SCHEME_VERSION,
+    }
 
 
 class ProofBundleType(Enum):
@@ -24,7 +44,7 @@ class ProofBundleType(Enum):
     TENANT_SCOPE = "tenant_scope"
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class AnchoringReference:
     """Reference to external anchoring system (e.g., blockchain, timestamp service)."""
     anchor_type: str  # "blockchain", "timestamp_service", "notary"
@@ -44,7 +64,7 @@ class AnchoringReference:
         }
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ComplianceProofBundle:
     """
     Complete compliance proof bundle for offline validation.
@@ -72,21 +92,52 @@ class ComplianceProofBundle:
             "created_at": self.created_at.isoformat(),
             "records": [r.to_dict() for r in self.records],
             "policy_commitments": self.policy_commitments,
-            "merkle_proofs": [
-                {
-                    "leaf_hash": p.leaf_hash,
-                    "root_hash": p.root_hash,
-                    "proof_hashes": p.proof_hashes,
-                }
-                for p in self.merkle_proofs
-            ],
+            "merkle_proofs": [_proof_to_dict(p) for p in self.merkle_proofs],
             "anchoring_refs": [ref.to_dict() for ref in self.anchoring_refs],
             "metadata": self.metadata,
         }
     
     def to_json(self) -> str:
         """Convert bundle to JSON string."""
-        return json.dumps(self.to_dict(), indent=2)
+        return json_dumps(self.to_dict(), indent=True)
+    
+    def iter_json(self) -> Iterator[str]:
+        """
+        Serialize the bundle as compact JSON, one record or proof at a time.
+        
+        Produces the same document as ``to_dict`` without materializing it,
+        so large bundles can be streamed to a file or an HTTP response.
+        
+        Yields:
+            Consecutive chunks of the JSON document
+        """
+        yield '{"bundle_id":' + json_dumps(self.bundle_id)
+        yield ',"bundle_type":' + json_dumps(self.bundle_type.value)
+        yield ',"created_at":' + json_dumps(self.created_at.isoformat())
+        
+        yield ',"records":['
+        for i, record in enumerate(self.records):
+            yield ("," if i else "") + json_dumps(record.to_dict())
+        
+        yield '],"policy_commitments":' + json_dumps(self.policy_commitments)
+        
+        yield ',"merkle_proofs":['
+        for i, proof in enumerate(self.merkle_proofs):
+            yield ("," if i else "") + json_dumps(_proof_to_dict(proof))
+        
+        yield '],"anchoring_refs":' + json_dumps([ref.to_dict() for ref in self.anchoring_refs])
+        yield ',"metadata":' + json_dumps(self.metadata) + "}"
+    
+    def dump(self, fp: TextIO) -> None:
+        """
+        Write the bundle as compact JSON to a text file object.
+        
+        Args:
+            fp: Writable text stream
+        """
+        write = fp.write
+        for chunk in self.iter_json():
+            write(chunk)
     
     def verify_integrity(self) -> bool:
         """
@@ -95,23 +146,100 @@ class ComplianceProofBundle:
         Returns:
             True if all verifications pass
         """
-        # Verify hash chain
-        for i, record in enumerate(self.records):
+        chain_valid, _ = self._verify_chain_detailed()
+        if not chain_valid:
+            return False
+        
+        # Verify Merkle proofs
+        return all(verify_proofs(self.merkle_proofs))
+    
+    def _verify_chain_detailed(self) -> Tuple[bool, List[str]]:
+        """
+        Check every record hash and chain link in a single pass.
+        
+        Returns:
+            Tuple of (chain is intact, error messages for each failure)
+        """
+        records = self.records
+        errors = []
+        
+        for i, record in enumerate(records):
             # Check record hash
             if record.record_hash != record.compute_hash():
-                return False
+                errors.append(f"Hash mismatch for record {record.record_id}")
             
             # Check chain link
             if i > 0:
-                if record.previous_hash != self.records[i - 1].record_hash:
-                    return False
+                if record.previous_hash != records[i - 1].record_hash:
+                    errors.append(f"Chain break at record {record.record_id}")
         
-        # Verify Merkle proofs
-        for proof in self.merkle_proofs:
-            if not proof.verify():
-                return False
+        return not errors, errors
+
+
+class _AnchorList(list):
+    """
+    List of anchoring references that records when it is modified.
+    
+    Every mutating list method sets ``modified``, so VerificationAPI can
+    rebuild its timestamp index after callers edit the list directly.
+    """
+    
+    __slots__ = ("modified",)
+    
+    def __init__(self, anchors=()):
+        super().__init__(anchors)
+        self.modified = True
+
+
+def _marks_modified(method):
+    """Wrap a list method so calling it flags the _AnchorList as modified."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self.modified = True
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+for _name in (
+    "append", "extend", "insert", "remove", "pop", "clear", "sort", "reverse",
+    "__setitem__", "__delitem__", "__iadd__", "__imul__",
+):
+    setattr(_AnchorList, _name, _marks_modified(getattr(list, _name)))
+
+
+class _TimeIndex:
+    """Record timestamps kept sorted, each paired with its ledger position."""
+    
+    __slots__ = ("keys", "positions")
+    
+    def __init__(self):
+        self.keys: List[datetime] = []
+        self.positions: List[int] = []
+    
+    def locate(self, timestamp: datetime) -> int:
+        """
+        Sorted slot for a timestamp, without modifying the index.
         
-        return True
+        Raises:
+            TypeError: If the timestamp cannot be ordered against the keys
+                (e.g. naive and timezone-aware datetimes are mixed)
+        """
+        keys = self.keys
+        # Records usually arrive in time order, making this an append
+        if not keys or timestamp >= keys[-1]:
+            return len(keys)
+        return bisect_right(keys, timestamp)
+    
+    def insert(self, slot: int, timestamp: datetime, position: int) -> None:
+        """Insert a record's timestamp at a slot returned by ``locate``."""
+        self.keys.insert(slot, timestamp)
+        self.positions.insert(slot, position)
+    
+    def between(self, start: datetime, end: datetime) -> List[int]:
+        """Ledger positions of records in [start, end], in ledger order."""
+        lo = bisect_left(self.keys, start)
+        hi = bisect_right(self.keys, end)
+        return sorted(self.positions[lo:hi])
 
 
 class VerificationAPI:
@@ -135,7 +263,44 @@ class VerificationAPI:
         """
         self.ledger = ledger
         self.policy_compiler = policy_compiler
-        self.anchoring_refs: List[AnchoringReference] = []
+        self._anchoring_refs = _AnchorList()  # sorted by timestamp once synced
+        self._anchor_times: List[datetime] = []
+        self._bundle_seq = itertools.count()  # disambiguates batch bundle IDs
+        
+        # Query indexes over the append-only ledger, caught up lazily
+        self._tenant_indexed_upto = 0
+        self._time_indexed_upto = 0
+        self._by_tenant: Dict[str, List[AuditRecord]] = defaultdict(list)
+        self._by_time = _TimeIndex()
+        self._by_tenant_time: Dict[str, _TimeIndex] = defaultdict(_TimeIndex)
+    
+    def _sync_tenant_index(self) -> None:
+        """Index records appended to the ledger since the last tenant query."""
+        records = self.ledger.records
+        by_tenant = self._by_tenant
+        
+        for i in range(self._tenant_indexed_upto, len(records)):
+            by_tenant[records[i].tenant_id].append(records[i])
+        
+        self._tenant_indexed_upto = len(records)
+    
+    def _sync_time_indexes(self) -> None:
+        """Index records appended to the ledger since the last time query."""
+        records = self.ledger.records
+        by_time = self._by_time
+        
+        for i in range(self._time_indexed_upto, len(records)):
+            record = records[i]
+            tenant_index = self._by_tenant_time[record.tenant_id]
+            
+            # Locate both slots first, so a timestamp that cannot be ordered
+            # raises before either index changes and a retry starts clean
+            slot = by_time.locate(record.timestamp)
+            tenant_slot = tenant_index.locate(record.timestamp)
+            by_time.insert(slot, record.timestamp, i)
+            tenant_index.insert(tenant_slot, record.timestamp, i)
+            
+            self._time_indexed_upto = i + 1
     
     def create_single_record_bundle(
         self, 
@@ -188,7 +353,8 @@ class VerificationAPI:
     def create_batch_bundle(
         self, 
         record_ids: List[str],
-        include_merkle_proofs: bool = True
+        include_merkle_proofs: bool = True,
+        proof_workers: Optional[int] = None
     ) -> Optional[ComplianceProofBundle]:
         """
         Create a proof bundle for multiple records.
@@ -196,6 +362,9 @@ class VerificationAPI:
         Args:
             record_ids: List of record identifiers
             include_merkle_proofs: Whether to include Merkle proofs
+            proof_workers: Generate proofs on a thread pool of this size.
+                Only useful for ledgers whose proof lookups block on I/O;
+                the in-memory ledger is faster serially.
             
         Returns:
             ComplianceProofBundle with all found records
@@ -210,22 +379,27 @@ class VerificationAPI:
             return None
         
         # Collect policy commitments
-        policy_commitments = {}
-        for record in records:
-            if record.policy_commitment:
-                policy_commitments[record.record_id] = record.policy_commitment
+        policy_commitments = {
+            r.record_id: r.policy_commitment for r in records if r.policy_commitment
+        }
         
         # Generate Merkle proofs if requested
         merkle_proofs = []
         if include_merkle_proofs:
-            for record_id in record_ids:
-                proof = self.ledger.generate_inclusion_proof(record_id)
-                if proof:
-                    merkle_proofs.append(proof)
+            if proof_workers is not None and proof_workers > 1:
+                workers = min(proof_workers, len(record_ids))
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    merkle_proofs = [
+                        proof
+                        for proof in pool.map(self.ledger.generate_inclusion_proof, record_ids)
+                        if proof
+                    ]
+            else:
+                merkle_proofs = self.ledger.generate_inclusion_proofs(record_ids)
         
         # Create bundle
         bundle = ComplianceProofBundle(
-            bundle_id=f"bundle-batch-{datetime.utcnow().timestamp()}",
+            bundle_id=f"bundle-batch-{time_ns():x}-{next(self._bundle_seq)}",
             bundle_type=ProofBundleType.BATCH_RECORDS,
             created_at=datetime.utcnow(),
             records=records,
@@ -260,26 +434,26 @@ class VerificationAPI:
         Returns:
             ComplianceProofBundle with matching records
         """
-        # Filter records by time range
-        records = []
-        for record in self.ledger.records:
-            if start_time <= record.timestamp <= end_time:
-                if tenant_id is None or record.tenant_id == tenant_id:
-                    records.append(record)
+        # Filter records by time range, keeping ledger order
+        self._sync_time_indexes()
+        if tenant_id is None:
+            index = self._by_time
+        else:
+            index = self._by_tenant_time.get(tenant_id, _TimeIndex())
+        ledger_records = self.ledger.records
+        records = [ledger_records[i] for i in index.between(start_time, end_time)]
         
         # Collect policy commitments
-        policy_commitments = {}
-        for record in records:
-            if record.policy_commitment:
-                policy_commitments[record.record_id] = record.policy_commitment
+        policy_commitments = {
+            r.record_id: r.policy_commitment for r in records if r.policy_commitment
+        }
         
         # Generate Merkle proofs if requested
         merkle_proofs = []
         if include_merkle_proofs:
-            for record in records:
-                proof = self.ledger.generate_inclusion_proof(record.record_id)
-                if proof:
-                    merkle_proofs.append(proof)
+            merkle_proofs = self.ledger.generate_inclusion_proofs(
+                [record.record_id for record in records]
+            )
         
         # Create bundle
         bundle = ComplianceProofBundle(
@@ -316,22 +490,21 @@ class VerificationAPI:
         Returns:
             ComplianceProofBundle with tenant's records
         """
-        # Filter records by tenant
-        records = [r for r in self.ledger.records if r.tenant_id == tenant_id]
+        # Look up records by tenant
+        self._sync_tenant_index()
+        records = list(self._by_tenant.get(tenant_id, ()))
         
         # Collect policy commitments
-        policy_commitments = {}
-        for record in records:
-            if record.policy_commitment:
-                policy_commitments[record.record_id] = record.policy_commitment
+        policy_commitments = {
+            r.record_id: r.policy_commitment for r in records if r.policy_commitment
+        }
         
         # Generate Merkle proofs if requested
         merkle_proofs = []
         if include_merkle_proofs:
-            for record in records:
-                proof = self.ledger.generate_inclusion_proof(record.record_id)
-                if proof:
-                    merkle_proofs.append(proof)
+            merkle_proofs = self.ledger.generate_inclusion_proofs(
+                [record.record_id for record in records]
+            )
         
         # Create bundle
         bundle = ComplianceProofBundle(
@@ -355,10 +528,40 @@ class VerificationAPI:
         """
         Add an external anchoring reference.
         
+        References are kept ordered by timestamp.
+        
         Args:
             anchor: Anchoring reference to add
         """
-        self.anchoring_refs.append(anchor)
+        self._sync_anchor_index()
+        i = bisect_right(self._anchor_times, anchor.timestamp)
+        self._anchor_times.insert(i, anchor.timestamp)
+        # list.insert bypasses the modification flag; the index is current
+        list.insert(self._anchoring_refs, i, anchor)
+    
+    @property
+    def anchoring_refs(self) -> List[AnchoringReference]:
+        """
+        Registered anchoring references.
+        
+        The list may be edited or replaced directly; the timestamp index is
+        rebuilt (re-sorting the list by timestamp) before the next lookup.
+        Changing the timestamp of an anchor already in the list is not
+        detected.
+        """
+        return self._anchoring_refs
+    
+    @anchoring_refs.setter
+    def anchoring_refs(self, anchors: List[AnchoringReference]) -> None:
+        self._anchoring_refs = _AnchorList(anchors)
+    
+    def _sync_anchor_index(self) -> None:
+        """Rebuild the anchor timestamp index if the list was edited directly."""
+        anchors = self._anchoring_refs
+        if anchors.modified:
+            list.sort(anchors, key=attrgetter("timestamp"))
+            self._anchor_times = [anchor.timestamp for anchor in anchors]
+            anchors.modified = False
     
     def _get_relevant_anchors(
         self, 
@@ -380,13 +583,11 @@ class VerificationAPI:
         min_time = min(r.timestamp for r in records)
         max_time = max(r.timestamp for r in records)
         
-        # Find anchors in the time range
-        relevant = [
-            anchor for anchor in self.anchoring_refs
-            if min_time <= anchor.timestamp <= max_time
-        ]
-        
-        return relevant
+        # Slice the anchors in the time range
+        self._sync_anchor_index()
+        lo = bisect_left(self._anchor_times, min_time)
+        hi = bisect_right(self._anchor_times, max_time)
+        return self._anchoring_refs[lo:hi]
     
     def verify_bundle(self, bundle: ComplianceProofBundle) -> Dict[str, Any]:
         """
@@ -408,33 +609,24 @@ class VerificationAPI:
             "errors": [],
         }
         
-        # Check integrity
+        # Check integrity: one pass over the chain and one over the proofs
+        chain_valid = False
+        merkle_valid = False
         try:
-            results["integrity_check"] = bundle.verify_integrity()
+            chain_valid, chain_errors = bundle._verify_chain_detailed()
+            results["errors"].extend(chain_errors)
+            
+            proof_results = verify_proofs(bundle.merkle_proofs)
+            merkle_valid = all(proof_results)
+            for proof, ok in zip(bundle.merkle_proofs, proof_results):
+                if not ok:
+                    results["errors"].append(f"Merkle proof failed for {proof.leaf_hash}")
+            
+            results["integrity_check"] = chain_valid and merkle_valid
         except Exception as e:
             results["errors"].append(f"Integrity check failed: {e}")
         
-        # Verify hash chain
-        chain_valid = True
-        for i, record in enumerate(bundle.records):
-            if record.record_hash != record.compute_hash():
-                chain_valid = False
-                results["errors"].append(f"Hash mismatch for record {record.record_id}")
-            
-            if i > 0:
-                if record.previous_hash != bundle.records[i - 1].record_hash:
-                    chain_valid = False
-                    results["errors"].append(f"Chain break at record {record.record_id}")
-        
         results["chain_verification"] = chain_valid
-        
-        # Verify Merkle proofs
-        merkle_valid = True
-        for proof in bundle.merkle_proofs:
-            if not proof.verify():
-                merkle_valid = False
-                results["errors"].append(f"Merkle proof failed for {proof.leaf_hash}")
-        
         results["merkle_verification"] = merkle_valid
         
         # Verify policy commitments
@@ -0,0 +1,170 @@
+"""
+Unit tests for Adaptive Audit Pipeline (AAP)
+"""
+
+import pytest
+from datetime import datetime
+import re
+import uuid
+
+from caas.aap import (
+    AuditConfiguration, AuditFidelity, AdaptiveAuditPipeline, PolicyCriticality
+)
+from caas.cal import AuditLedger
+from caas.cei import ComplianceEvent, EventType
+from caas.pac import Policy, PolicyAction, PolicyCompiler, PolicyEffect, PolicyStatement
+
+
+def make_event(tenant_id="tenant-1", bucket="test-bucket", **overrides):
+    """Create a compliance event for pipeline tests."""
+    fields = dict(
+        event_id=str(uuid.uuid4()),
+        event_type=EventType.OBJECT_CREATE,
+        timestamp=datetime(2024, 1, 1, 12, 0, 0),
+        tenant_id=tenant_id,
+        bucket=bucket,
+        object_key="test.txt",
+        principal="user-1",
+        metadata={"size": 1024},
+    )
+    fields.update(overrides)
+    return ComplianceEvent(**fields)
+
+
+class TestAuditConfiguration:
+    """Test AuditConfiguration class."""
+    
+    def test_bucket_fidelity_keyed_by_tenant_and_bucket(self):
+        """Test that bucket overrides apply only to their own tenant."""
+        config = AuditConfiguration()
+        config.bucket_configs[("tenant-1", "logs")] = AuditFidelity.MERKLE_PROOF
+        
+        assert config.get_fidelity("tenant-1", "logs") == AuditFidelity.MERKLE_PROOF
+        assert config.get_fidelity("tenant-2", "logs") == AuditFidelity.CHAINED
+        assert config.get_fidelity("tenant-1", "other") == AuditFidelity.CHAINED
+    
+    def test_fidelity_precedence(self):
+        """Test tenant over bucket over criticality over default."""
+        config = AuditConfiguration()
+        config.bucket_configs[("tenant-1", "logs")] = AuditFidelity.POLICY_BOUND
+        
+        assert (config.get_fidelity("tenant-1", "logs", PolicyCriticality.LOW)
+                == AuditFidelity.POLICY_BOUND)
+        
+        config.tenant_configs["tenant-1"] = AuditFidelity.METADATA_ONLY
+        
+        assert config.get_fidelity("tenant-1", "logs") == AuditFidelity.METADATA_ONLY
+        assert (config.get_fidelity("tenant-2", "logs", PolicyCriticality.CRITICAL)
+                == AuditFidelity.MERKLE_PROOF)
+
+
+class TestAdaptiveAuditPipeline:
+    """Test AdaptiveAuditPipeline class."""
+    
+    def test_set_bucket_fidelity(self):
+        """Test that set_bucket_fidelity stores a (tenant, bucket) key."""
+        pipeline = AdaptiveAuditPipeline(AuditLedger())
+        pipeline.set_bucket_fidelity("tenant-1", "logs", AuditFidelity.MERKLE_PROOF)
+        
+        assert pipeline.config.bucket_configs == {
+            ("tenant-1", "logs"): AuditFidelity.MERKLE_PROOF
+        }
+        assert (pipeline.process_event(make_event(bucket="logs")).fidelity
+                == AuditFidelity.MERKLE_PROOF)
+        assert (pipeline.process_event(make_event(tenant_id="tenant-2", bucket="logs")).fidelity
+                == AuditFidelity.CHAINED)
+    
+    def test_record_metadata_per_fidelity(self):
+        """Test the record metadata and policy binding at each fidelity level."""
+        pipeline = AdaptiveAuditPipeline(AuditLedger())
+        policy = PolicyCompiler().compile(Policy(
+            policy_id="policy-1",
+            version="1.0",
+            name="Test",
+            statements=[
+                PolicyStatement(
+                    sid="stmt-1",
+                    effect=PolicyEffect.ALLOW,
+                    actions=[PolicyAction.WRITE],
+                    resources=["test-bucket/*"]
+                )
+            ]
+        ))
+        
+        records = {}
+        for fidelity in AuditFidelity:
+            pipeline.set_tenant_fidelity("tenant-1", fidelity)
+            processed = pipeline.process_event(make_event(), policy=policy)
+            records[fidelity] = processed.audit_record
+        
+        assert records[AuditFidelity.METADATA_ONLY].metadata == {
+            "fidelity": "metadata_only",
+            "principal": "user-1",
+        }
+        assert records[AuditFidelity.CHAINED].metadata == {
+            "fidelity": "chained",
+            "principal": "user-1",
+            "event_metadata": {"size": 1024},
+        }
+        assert records[AuditFidelity.POLICY_BOUND].metadata == {
+            "fidelity": "policy_bound",
+            "principal": "user-1",
+            "event_metadata": {"size": 1024},
+        }
+        assert records[AuditFidelity.MERKLE_PROOF].metadata == {
+            "fidelity": "merkle_proof",
+            "principal": "user-1",
+            "event_metadata": {"size": 1024},
+            "supports_merkle_proof": True,
+        }
+        
+        assert records[AuditFidelity.METADATA_ONLY].policy_commitment is None
+        assert records[AuditFidelity.CHAINED].policy_commitment is None
+        assert records[AuditFidelity.POLICY_BOUND].policy_commitment == policy.commitment_hash
+        assert records[AuditFidelity.MERKLE_PROOF].policy_commitment == policy.commitment_hash
+    
+    def test_statistics(self):
+        """Test the fidelity distribution in pipeline statistics."""
+        pipeline = AdaptiveAuditPipeline(AuditLedger())
+        pipeline.set_tenant_fidelity("tenant-2", AuditFidelity.MERKLE_PROOF)
+        
+        for _ in range(3):
+            pipeline.process_event(make_event())
+        pipeline.process_event(make_event(tenant_id="tenant-2"))
+        
+        assert pipeline.get_statistics() == {
+            "total_processed": 4,
+            "fidelity_distribution": {"chained": 3, "merkle_proof": 1},
+            "ledger_record_count": 4,
+        }
+        assert AdaptiveAuditPipeline(AuditLedger()).get_statistics() == {
+            "total_processed": 0,
+            "fidelity_distribution": {},
+            "ledger_record_count": 0,
+        }
+    
+    def test_record_id_format(self):
+        """Test that default record IDs are a pipeline prefix plus sequence."""
+        pipeline = AdaptiveAuditPipeline(AuditLedger())
+        
+        ids = [pipeline.process_event(make_event()).audit_record.record_id for _ in range(3)]
+        
+        for seq, record_id in enumerate(ids):
+            assert re.fullmatch(r"[0-9a-f]{8}-[0-9a-f]{16}", record_id)
+            assert record_id.endswith(f"-{seq:016x}")
+        assert len({record_id.split("-")[0] for record_id in ids}) == 1
+        
+        other = AdaptiveAuditPipeline(AuditLedger()).new_record_id()
+        assert other not in ids
+    
+    def test_id_factory(self):
+        """Test that a custom id_factory supplies record IDs."""
+        ids = iter(["rec-a", "rec-b"])
+        pipeline = AdaptiveAuditPipeline(AuditLedger(), id_factory=lambda: next(ids))
+        
+        first = pipeline.process_event(make_event())
+        second = pipeline.process_event(make_event())
+        
+        assert first.audit_record.record_id == "rec-a"
+        assert second.audit_record.record_id == "rec-b"
+        assert pipeline.ledger.get_record("rec-b") is second.audit_record
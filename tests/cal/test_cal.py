@@ -4,10 +4,12 @@ Unit tests for Cryptographic Audit Ledger (CAL)
 
 import pytest
 from datetime import datetime
+import hashlib
 import uuid
 
 from caas.cal import (
-    AuditRecord, AuditLedger, MerkleTree, MerkleProof, MerkleNode
+    MERKLE_SCHEME_VERSION, RECORD_HASH_SCHEME_VERSION, AuditRecord, AuditLedger, MerkleTree, MerkleProof,
+    MerkleNode, verify_proofs
 )
 
 
@@ -48,6 +50,87 @@ class TestAuditRecord:
         assert hash1 == hash2
         assert len(hash1) == 64  # SHA-256
     
+    def test_record_hash_covers_metadata(self):
+        """Test that metadata changes alter the record hash."""
+        def make_record(metadata):
+            return AuditRecord(
+                record_id="rec-123",
+                event_id="evt-123",
+                timestamp=datetime(2024, 1, 1, 12, 0, 0),
+                event_type="object.create",
+                tenant_id="tenant-1",
+                bucket="test-bucket",
+                metadata=metadata
+            )
+        
+        assert (make_record({"a": 1, "b": 2}).compute_hash()
+                == make_record({"b": 2, "a": 1}).compute_hash())
+        assert (make_record({"a": 1}).compute_hash()
+                != make_record({"a": 2}).compute_hash())
+    
+    def test_record_hash_reflects_current_fields(self):
+        """Test that the hash follows fields edited after construction."""
+        record = AuditRecord(
+            record_id="rec-123",
+            event_id="evt-123",
+            timestamp=datetime(2024, 1, 1, 12, 0, 0),
+            event_type="object.create",
+            tenant_id="tenant-1",
+            bucket="test-bucket"
+        )
+        original = record.compute_hash()
+        
+        record.event_type = "object.delete"
+        
+        assert record.compute_hash() != original
+    
+    def test_record_hash_field_boundaries(self):
+        """Test that field boundaries and absent fields are unambiguous."""
+        def make_record(**overrides):
+            fields = dict(
+                record_id="rec-123",
+                event_id="evt-123",
+                timestamp=datetime(2024, 1, 1, 12, 0, 0),
+                event_type="object.create",
+                tenant_id="tenant-1",
+                bucket="test-bucket",
+            )
+            fields.update(overrides)
+            return AuditRecord(**fields)
+        
+        # Separator-like bytes cannot move content between fields
+        assert (make_record(tenant_id="a\x1fb", bucket="c").compute_hash()
+                != make_record(tenant_id="a", bucket="b\x1fc").compute_hash())
+        # An absent optional field differs from an empty one
+        assert (make_record(object_key=None).compute_hash()
+                != make_record(object_key="").compute_hash())
+    
+    def test_record_hash_preimage_layout(self):
+        """Test the documented length-prefixed record hash preimage."""
+        record = AuditRecord(
+            record_id="rec-123",
+            event_id="evt-123",
+            timestamp=datetime(2024, 1, 1, 12, 0, 0),
+            event_type="object.create",
+            tenant_id="tenant-1",
+            bucket="test-bucket",
+            metadata={"b": 1, "a": "x"},
+            previous_hash="0" * 64
+        )
+        
+        fields = [
+            b"rec-123", b"evt-123", b"2024-01-01T12:00:00", b"object.create",
+            b"tenant-1", b"test-bucket", None, None, b'{"a":"x","b":1}', b"0" * 64,
+        ]
+        preimage = b"".join(
+            b"\xff\xff\xff\xff" if value is None else len(value).to_bytes(4, "big") + value
+            for value in fields
+        )
+        
+        assert RECORD_HASH_SCHEME_VERSION == 2
+        assert record.compute_hash() == hashlib.sha256(preimage).hexdigest()
+        assert record.to_dict()["hash_scheme_version"] == RECORD_HASH_SCHEME_VERSION
+    
     def test_record_to_dict(self):
         """Test converting record to dictionary."""
         record_id = str(uuid.uuid4())
@@ -116,6 +199,58 @@ class TestMerkleTree:
         proof = tree.generate_proof("hash3")
         
         assert proof is None
+    
+    def test_proof_for_duplicate_leaf_uses_first_occurrence(self):
+        """Test that a repeated leaf is proven at its first position."""
+        tree = MerkleTree(["hash1", "hash2", "hash3", "hash1"])
+        
+        proof = tree.generate_proof("hash1")
+        
+        # The first occurrence is a left child, so its sibling is on the right
+        assert proof.proof_hashes[0][1] == "right"
+        assert proof.verify() is True
+    
+    def test_incremental_append_matches_batch_build(self):
+        """Test that appending leaves one by one yields the same tree."""
+        leaves = [f"hash{i}" for i in range(11)]
+        tree = MerkleTree([])
+        
+        for count, leaf in enumerate(leaves, start=1):
+            tree.append(leaf)
+            expected = MerkleTree(leaves[:count])
+            
+            assert tree.get_root_hash() == expected.get_root_hash()
+            proof = tree.generate_proof(leaves[0])
+            assert proof.root_hash == expected.get_root_hash()
+            assert proof.verify() is True
+    
+    def test_unsupported_hash_algo(self):
+        """Test that unknown Merkle hash algorithms are rejected."""
+        with pytest.raises(ValueError):
+            MerkleTree(["hash1", "hash2"], hash_algo="md5")
+        with pytest.raises(ValueError):
+            AuditLedger(hash_algo="md5")
+    
+    def test_root_matches_java_implementation(self):
+        """Test the scheme version 2 root shared with MerkleTree.java."""
+        tree = MerkleTree(["hash1", "hash2", "hash3"])
+        
+        assert MERKLE_SCHEME_VERSION == 2
+        assert tree.get_root_hash() == (
+            "99d8e6491946cd229bdbe0cf18720bdf71f124fc825f9b32f6287b83156eb6c2"
+        )
+    
+    def test_blake3_tree(self):
+        """Test building and proving a BLAKE3 Merkle tree."""
+        pytest.importorskip("blake3")
+        leaves = ["hash1", "hash2", "hash3"]
+        tree = MerkleTree(leaves, hash_algo="blake3")
+        
+        assert tree.get_root_hash() != MerkleTree(leaves).get_root_hash()
+        for leaf in leaves:
+            proof = tree.generate_proof(leaf)
+            assert proof.hash_algo == "blake3"
+            assert proof.verify() is True
 
 
 class TestMerkleProof:
@@ -131,6 +266,53 @@ class TestMerkleProof:
             proof = tree.generate_proof(leaf)
             assert proof is not None
             assert proof.verify() is True
+    
+    def test_proof_verification_odd_leaf_counts(self):
+        """Test proofs verify for every leaf when levels have odd sizes."""
+        for count in range(1, 10):
+            leaves = [f"hash{i}" for i in range(count)]
+            tree = MerkleTree(leaves)
+            
+            for leaf in leaves:
+                proof = tree.generate_proof(leaf)
+                assert proof is not None
+                assert proof.root_hash == tree.get_root_hash()
+                assert proof.verify() is True
+    
+    def test_tampered_proof_fails(self):
+        """Test that altered or malformed proof paths do not verify."""
+        leaves = ["hash1", "hash2", "hash3", "hash4"]
+        tree = MerkleTree(leaves)
+        proof = tree.generate_proof("hash3")
+        
+        sibling, position = proof.proof_hashes[0]
+        forged = MerkleProof(
+            leaf_hash=proof.leaf_hash,
+            root_hash=proof.root_hash,
+            proof_hashes=(("0" * 64, position),) + proof.proof_hashes[1:]
+        )
+        malformed = MerkleProof(
+            leaf_hash=proof.leaf_hash,
+            root_hash=proof.root_hash,
+            proof_hashes=(("not-hex", position),) + proof.proof_hashes[1:]
+        )
+        
+        assert len(sibling) == 64
+        assert forged.verify() is False
+        assert malformed.verify() is False
+    
+    def test_verify_proofs_batch(self):
+        """Test batch verification shares work but reports each proof."""
+        leaves = [f"hash{i}" for i in range(7)]
+        tree = MerkleTree(leaves)
+        proofs = [tree.generate_proof(leaf) for leaf in leaves]
+        forged = MerkleProof(
+            leaf_hash="hash-x",
+            root_hash=proofs[0].root_hash,
+            proof_hashes=proofs[0].proof_hashes
+        )
+        
+        assert verify_proofs(proofs + [forged]) == [True] * 7 + [False]
 
 
 class TestAuditLedger:
@@ -192,6 +374,36 @@ class TestAuditLedger:
         assert record2.previous_hash == hash1
         assert ledger.get_record_count() == 2
     
+    def test_append_batch(self):
+        """Test batch append produces the same chain as single appends."""
+        def make_records():
+            return [
+                AuditRecord(
+                    record_id=f"rec-{i}",
+                    event_id=f"evt-{i}",
+                    timestamp=datetime(2024, 1, 1, 12, 0, i),
+                    event_type="object.create",
+                    tenant_id="tenant-1",
+                    bucket="test-bucket"
+                )
+                for i in range(7)
+            ]
+        
+        single = AuditLedger()
+        single.tree_batch_size = 3
+        expected = [single.append(r) for r in make_records()]
+        
+        batched = AuditLedger()
+        batched.tree_batch_size = 3
+        batched.append(make_records()[0])
+        hashes = batched.append_batch(make_records()[1:])
+        
+        assert hashes == expected[1:]
+        assert batched.get_record_count() == 7
+        assert len(batched.merkle_trees) == 2
+        assert batched.verify_chain_integrity() is True
+        assert batched.get_record("rec-4").record_hash == expected[4]
+    
     def test_get_record(self):
         """Test retrieving a record by ID."""
         ledger = AuditLedger()
@@ -261,6 +473,134 @@ class TestAuditLedger:
         # Verify integrity should fail
         assert ledger.verify_chain_integrity() is False
     
+    def test_fields_edited_before_append(self):
+        """Test that records edited before appending still verify."""
+        ledger = AuditLedger()
+        
+        for i in range(3):
+            record = AuditRecord(
+                record_id=f"rec-{i}",
+                event_id=f"evt-{i}",
+                timestamp=datetime.utcnow(),
+                event_type="object.create",
+                tenant_id="tenant-1",
+                bucket="test-bucket"
+            )
+            record.object_key = f"obj-{i}"
+            record.metadata["size"] = i
+            ledger.append(record)
+        
+        assert ledger.verify_chain_integrity() is True
+    
+    def test_detect_tampered_metadata(self):
+        """Test detecting in-place metadata edits without a full check."""
+        ledger = AuditLedger()
+        
+        for i in range(3):
+            record = AuditRecord(
+                record_id=f"rec-{i}",
+                event_id=f"evt-{i}",
+                timestamp=datetime.utcnow(),
+                event_type="object.create",
+                tenant_id="tenant-1",
+                bucket="test-bucket",
+                metadata={"size": i}
+            )
+            ledger.append(record)
+        
+        ledger.records[1].metadata["size"] = 99
+        
+        assert ledger.verify_chain_integrity() is False
+    
+    def test_detect_broken_chain_link(self):
+        """Test detecting a record whose chain link was rewritten."""
+        ledger = AuditLedger()
+        
+        for i in range(3):
+            record = AuditRecord(
+                record_id=f"rec-{i}",
+                event_id=f"evt-{i}",
+                timestamp=datetime.utcnow(),
+                event_type="object.create",
+                tenant_id="tenant-1",
+                bucket="test-bucket"
+            )
+            ledger.append(record)
+        
+        # Re-link a record and recompute its own hash so only the link breaks
+        tampered = ledger.records[2]
+        tampered.previous_hash = "f" * 64
+        tampered.record_hash = tampered.compute_hash()
+        
+        assert ledger.verify_chain_integrity() is False
+    
+    def test_incremental_verification(self):
+        """Test that verification resumes from the last verified record."""
+        ledger = AuditLedger()
+        
+        def append(i):
+            ledger.append(AuditRecord(
+                record_id=f"rec-{i}",
+                event_id=f"evt-{i}",
+                timestamp=datetime.utcnow(),
+                event_type="object.create",
+                tenant_id="tenant-1",
+                bucket="test-bucket"
+            ))
+        
+        for i in range(3):
+            append(i)
+        assert ledger.verify_chain_integrity() is True
+        
+        # Tampering behind the watermark needs a full pass to be detected
+        ledger.records[0].event_type = "object.delete"
+        append(3)
+        assert ledger.verify_chain_integrity() is True
+        assert ledger.verify_chain_integrity(full=True) is False
+        
+        ledger.invalidate_cache()
+        assert ledger.verify_chain_integrity() is False
+    
+    def test_truncation_below_watermark(self):
+        """Test that removing verified records fails instead of raising."""
+        for remove in (lambda records: records.pop(), lambda records: records.pop(2)):
+            ledger = AuditLedger()
+            for i in range(5):
+                ledger.append(AuditRecord(
+                    record_id=f"rec-{i}",
+                    event_id=f"evt-{i}",
+                    timestamp=datetime.utcnow(),
+                    event_type="object.create",
+                    tenant_id="tenant-1",
+                    bucket="test-bucket"
+                ))
+            assert ledger.verify_chain_integrity() is True
+            
+            remove(ledger.records)
+            
+            assert ledger.verify_chain_integrity() is False
+            assert ledger.verify_chain_integrity(full=True) is False
+    
+    def test_full_verification_detects_metadata_tampering(self):
+        """Test that in-place metadata edits are caught by full verification."""
+        ledger = AuditLedger()
+        
+        for i in range(3):
+            record = AuditRecord(
+                record_id=f"rec-{i}",
+                event_id=f"evt-{i}",
+                timestamp=datetime.utcnow(),
+                event_type="object.create",
+                tenant_id="tenant-1",
+                bucket="test-bucket",
+                metadata={"principal": "user@example.com"}
+            )
+            ledger.append(record)
+        
+        ledger.records[1].metadata["principal"] = "attacker@example.com"
+        
+        assert ledger.verify_chain_integrity(full=True) is False
+    
     def test_merkle_tree_generation(self):
         """Test automatic Merkle tree generation."""
         ledger = AuditLedger()
@@ -304,6 +644,61 @@ class TestAuditLedger:
         assert proof is not None
         assert proof.verify() is True
     
+    def test_generate_inclusion_proofs(self):
+        """Test batch proof generation and caching of sealed-batch proofs."""
+        ledger = AuditLedger()
+        ledger.tree_batch_size = 4
+        
+        for i in range(6):
+            ledger.append(AuditRecord(
+                record_id=f"rec-{i}",
+                event_id=f"evt-{i}",
+                timestamp=datetime.utcnow(),
+                event_type="object.create",
+                tenant_id="tenant-1",
+                bucket="test-bucket"
+            ))
+        
+        proofs = ledger.generate_inclusion_proofs(["rec-1", "missing", "rec-5"])
+        
+        assert [p.leaf_hash for p in proofs] == [
+            ledger.get_record("rec-1").record_hash,
+            ledger.get_record("rec-5").record_hash,
+        ]
+        assert all(p.verify() for p in proofs)
+        # Sealed batch proofs are reused
+        assert ledger.generate_inclusion_proof("rec-1") is proofs[0]
+        
+        # Cached proofs cannot be corrupted by callers
+        with pytest.raises(AttributeError):
+            proofs[0].root_hash = "f" * 64
+        with pytest.raises(AttributeError):
+            proofs[0].proof_hashes.append(("f" * 64, "left"))
+        assert ledger.generate_inclusion_proof("rec-1").verify() is True
+    
+    def test_inclusion_proof_for_pending_batch(self):
+        """Test proving a record whose batch tree is not yet complete."""
+        ledger = AuditLedger()
+        ledger.tree_batch_size = 4
+        
+        for i in range(6):
+            record = AuditRecord(
+                record_id=f"rec-{i}",
+                event_id=f"evt-{i}",
+                timestamp=datetime.utcnow(),
+                event_type="object.create",
+                tenant_id="tenant-1",
+                bucket="test-bucket"
+            )
+            ledger.append(record)
+        
+        proof = ledger.generate_inclusion_proof("rec-5")
+        
+        assert len(ledger.merkle_trees) == 1
+        assert proof is not None
+        assert proof.leaf_hash == ledger.get_record("rec-5").record_hash
+        assert proof.verify() is True
+    
     def test_get_latest_record(self):
         """Test getting the latest record."""
         ledger = AuditLedger()
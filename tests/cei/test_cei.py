@@ -4,6 +4,7 @@ Unit tests for Compliance Event Interceptor (CEI)
 
 import pytest
 from datetime import datetime
+import threading
 import uuid
 
 from caas.cei import (
@@ -69,6 +70,51 @@ class TestComplianceEvent:
         # Hash should be deterministic
         assert hash1 == hash2
         assert len(hash1) == 64  # SHA-256 hex
+    
+    def test_event_hash_covers_fields(self):
+        """Test that changing any hashed field changes the event hash."""
+        def make_event(**overrides):
+            fields = dict(
+                event_id="evt-123",
+                event_type=EventType.OBJECT_CREATE,
+                timestamp=datetime(2024, 1, 1, 12, 0, 0),
+                tenant_id="tenant-1",
+                bucket="test-bucket",
+                metadata={"size": 1024},
+            )
+            fields.update(overrides)
+            return ComplianceEvent(**fields)
+        
+        base_hash = make_event().compute_hash()
+        
+        assert make_event(event_type=EventType.OBJECT_DELETE).compute_hash() != base_hash
+        assert make_event(object_key="a.txt").compute_hash() != base_hash
+        assert make_event(metadata={"size": 2048}).compute_hash() != base_hash
+        
+        # Field boundaries and absent fields are unambiguous
+        assert (make_event(tenant_id="a\x1fb", bucket="c").compute_hash()
+                != make_event(tenant_id="a", bucket="b\x1fc").compute_hash())
+        assert make_event(principal="").compute_hash() != base_hash
+    
+    def test_event_hash_follows_field_changes(self):
+        """Test that the event hash reflects fields changed after hashing."""
+        event = ComplianceEvent(
+            event_id="evt-123",
+            event_type=EventType.OBJECT_CREATE,
+            timestamp=datetime(2024, 1, 1, 12, 0, 0),
+            tenant_id="tenant-1",
+            bucket="test-bucket"
+        )
+        original = event.compute_hash()
+        
+        event.event_type = EventType.OBJECT_DELETE
+        
+        assert event.compute_hash() != original
+        
+        event.event_type = EventType.OBJECT_CREATE
+        event.metadata["size"] = 1
+        
+        assert event.compute_hash() != original
 
 
 class TestEventInterceptor:
@@ -116,6 +162,136 @@ class TestEventInterceptor:
         assert retrieved is not None
         assert retrieved.event_id == event.event_id
     
+    def test_get_event_waits_for_producer(self):
+        """Test that the default queue blocks get_event until an event arrives."""
+        interceptor = EventInterceptor()
+        event = ComplianceEvent(
+            event_id="evt-late",
+            event_type=EventType.OBJECT_CREATE,
+            timestamp=datetime.utcnow(),
+            tenant_id="tenant-1",
+            bucket="test-bucket"
+        )
+        
+        producer = threading.Timer(0.05, interceptor.intercept, args=(event,))
+        producer.start()
+        try:
+            retrieved = interceptor.get_event(timeout=5)
+        finally:
+            producer.join()
+        
+        assert retrieved is event
+    
+    def test_full_queue_rejects_events(self):
+        """Test that a full queue rejects events on both queue backends."""
+        for fast_path in (True, False):
+            interceptor = EventInterceptor(max_queue_size=2, fast_path=fast_path)
+            results = []
+            
+            for i in range(3):
+                event = ComplianceEvent(
+                    event_id=f"evt-{i}",
+                    event_type=EventType.OBJECT_CREATE,
+                    timestamp=datetime.utcnow(),
+                    tenant_id="tenant-1",
+                    bucket="test-bucket"
+                )
+                results.append(interceptor.intercept(event))
+            
+            assert results == [True, True, False]
+            assert interceptor.get_event_count() == 2
+            assert interceptor.get_event().event_id == "evt-0"
+            assert interceptor.get_event().event_id == "evt-1"
+            assert interceptor.get_event() is None
+    
+    def test_unbounded_queue_sizes(self):
+        """Test that zero and negative queue sizes mean unbounded."""
+        for max_queue_size in (0, -1):
+            for fast_path in (True, False):
+                interceptor = EventInterceptor(
+                    max_queue_size=max_queue_size, fast_path=fast_path
+                )
+                
+                for i in range(5):
+                    event = ComplianceEvent(
+                        event_id=f"evt-{i}",
+                        event_type=EventType.OBJECT_CREATE,
+                        timestamp=datetime.utcnow(),
+                        tenant_id="tenant-1",
+                        bucket="test-bucket"
+                    )
+                    assert interceptor.intercept(event) is True
+                
+                assert interceptor.get_event_count() == 5
+                assert len(interceptor.get_intercepted_events()) == 5
+    
+    def test_batch_intercept(self):
+        """Test batch interception up to queue capacity on both backends."""
+        for fast_path in (True, False):
+            interceptor = EventInterceptor(max_queue_size=3, fast_path=fast_path)
+            handled = []
+            interceptor.register_handler(handled.append)
+            
+            events = [
+                ComplianceEvent(
+                    event_id=f"evt-{i}",
+                    event_type=EventType.OBJECT_CREATE,
+                    timestamp=datetime.utcnow(),
+                    tenant_id="tenant-1",
+                    bucket="test-bucket"
+                )
+                for i in range(4)
+            ]
+            
+            assert interceptor.batch_intercept(events) == 3
+            assert interceptor.get_event_count() == 3
+            assert [e.event_id for e in handled] == ["evt-0", "evt-1", "evt-2"]
+            assert interceptor.get_event().event_id == "evt-0"
+    
+    def test_batch_intercept_skips_malformed_events(self, caplog):
+        """Test that a malformed event is rejected without failing the batch."""
+        for fast_path in (True, False):
+            interceptor = EventInterceptor(fast_path=fast_path)
+            
+            events = [
+                ComplianceEvent(
+                    event_id=f"evt-{i}",
+                    event_type=EventType.OBJECT_CREATE,
+                    timestamp=datetime.utcnow(),
+                    tenant_id=tenant_id,
+                    bucket="test-bucket"
+                )
+                for i, tenant_id in enumerate(["tenant-1", 42, "tenant-1"])
+            ]
+            
+            assert interceptor.intercept(events[1]) is False
+            assert interceptor.batch_intercept(events) == 2
+            assert [e.event_id for e in interceptor.get_intercepted_events()] == ["evt-0", "evt-2"]
+            assert "Failed to intercept event evt-1" in caplog.text
+    
+    def test_failing_handler_does_not_block_others(self, caplog):
+        """Test that a handler error is logged and later handlers still run."""
+        interceptor = EventInterceptor()
+        handled = []
+        
+        def failing_handler(event: ComplianceEvent):
+            raise RuntimeError("boom")
+        
+        interceptor.register_handler(failing_handler)
+        interceptor.register_handler(handled.append)
+        
+        event = ComplianceEvent(
+            event_id="evt-1",
+            event_type=EventType.OBJECT_CREATE,
+            timestamp=datetime.utcnow(),
+            tenant_id="tenant-1",
+            bucket="test-bucket"
+        )
+        
+        assert interceptor.intercept(event) is True
+        assert handled == [event]
+        assert "Handler error for event evt-1" in caplog.text
+    
     def test_verify_completeness(self):
         """Test verifying event completeness."""
         interceptor = EventInterceptor()
@@ -135,6 +311,47 @@ class TestEventInterceptor:
         assert interceptor.verify_completeness(2) is False
         assert interceptor.verify_completeness(4) is False
     
+    def test_intercept_interns_routing_keys(self):
+        """Test that intercepted events share interned tenant/bucket strings."""
+        interceptor = EventInterceptor()
+        events = []
+        
+        for suffix in ("a", "b"):
+            event = ComplianceEvent(
+                event_id=str(uuid.uuid4()),
+                event_type=EventType.OBJECT_CREATE,
+                timestamp=datetime.utcnow(),
+                tenant_id="".join(["tenant-", suffix[:0], "1"]),
+                bucket="".join(["bucket-", suffix[:0], "1"])
+            )
+            interceptor.intercept(event)
+            events.append(event)
+        
+        assert events[0].tenant_id is events[1].tenant_id
+        assert events[0].bucket is events[1].bucket
+    
+    def test_intercepted_events_window_is_bounded(self):
+        """Test that only the most recent events are retained."""
+        interceptor = EventInterceptor(max_queue_size=3)
+        event_ids = []
+        
+        for i in range(5):
+            event = ComplianceEvent(
+                event_id=f"evt-{i}",
+                event_type=EventType.OBJECT_CREATE,
+                timestamp=datetime.utcnow(),
+                tenant_id="tenant-1",
+                bucket="test-bucket"
+            )
+            interceptor.intercept(event)
+            interceptor.get_event()  # Drain so the queue never fills
+            event_ids.append(event.event_id)
+        
+        recent = interceptor.get_intercepted_events()
+        
+        assert [e.event_id for e in recent] == event_ids[-3:]
+        assert interceptor.verify_completeness(5) is True
+    
     def test_handler_registration(self):
         """Test registering event handlers."""
         interceptor = EventInterceptor()
@@ -270,3 +487,23 @@ class TestEventFilter:
         assert filter.matches(event1) is True
         assert filter.matches(event2) is False
         assert filter.matches(event3) is False
+    
+    def test_direct_filter_set_edits(self):
+        """Test that edits to the public filter sets take effect."""
+        filter = EventFilter()
+        filter.add_event_type_filter(EventType.OBJECT_CREATE)
+        event = ComplianceEvent(
+            event_id=str(uuid.uuid4()),
+            event_type=EventType.OBJECT_DELETE,
+            timestamp=datetime.utcnow(),
+            tenant_id="tenant-1",
+            bucket="test-bucket"
+        )
+        
+        assert filter.matches(event) is False
+        
+        filter.event_type_filters.add(EventType.OBJECT_DELETE)
+        assert filter.matches(event) is True
+        
+        filter.event_type_filters.clear()
+        assert filter.matches(event) is True
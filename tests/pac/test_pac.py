@@ -4,6 +4,8 @@ Unit tests for Policy-to-Audit Compiler (PAC)
 
 import pytest
 from datetime import datetime
+import hashlib
+import json
 
 from caas.pac import (
     Policy, PolicyStatement, PolicyEffect, PolicyAction,
@@ -123,6 +125,62 @@ class TestPolicyCompiler:
         assert canonical.commitment_hash is not None
         assert len(canonical.commitment_hash) == 64  # SHA-256
     
+    def test_commitment_is_sha256_of_canonical_form(self):
+        """Test that the commitment hashes the UTF-8 canonical form."""
+        compiler = PolicyCompiler()
+        
+        stmt = PolicyStatement(
+            sid="stmt-1",
+            effect=PolicyEffect.ALLOW,
+            actions=[PolicyAction.READ],
+            resources=["bucket/*"]
+        )
+        policy = Policy(
+            policy_id="policy-1",
+            version="1.0",
+            name="Read Policy",
+            statements=[stmt]
+        )
+        
+        canonical = compiler.compile(policy)
+        
+        normalized = compiler._normalize_policy(policy)
+        assert canonical.canonical_form == json.dumps(normalized, sort_keys=True)
+        
+        expected = hashlib.sha256(canonical.canonical_form.encode()).hexdigest()
+        assert canonical.commitment_hash == expected
+    
+    def test_canonical_form_matches_normalized_json(self):
+        """Test the specialized encoder against encoding the normalized dict."""
+        compiler = PolicyCompiler()
+        
+        policy = Policy(
+            policy_id="policy-\u00e9",
+            version="1.0",
+            name='Quoted "name"',
+            statements=[
+                PolicyStatement(
+                    sid="stmt-2",
+                    effect=PolicyEffect.DENY,
+                    actions=[PolicyAction.DELETE, PolicyAction.ALL],
+                    resources=["bucket/b", "bucket/a"],
+                    principals=["user-2", "user-1"],
+                    conditions={"IpAddress": {"aws:SourceIp": "10.0.0.0/8"}, "Max": 1.5}
+                ),
+                PolicyStatement(
+                    sid="stmt-1",
+                    effect=PolicyEffect.ALLOW,
+                    actions=[PolicyAction.READ],
+                    resources=["bucket/*"]
+                ),
+            ]
+        )
+        
+        canonical = compiler.compile(policy)
+        
+        normalized = compiler._normalize_policy(policy)
+        assert canonical.canonical_form == json.dumps(normalized, sort_keys=True)
+    
     def test_canonical_form_deterministic(self):
         """Test that canonical form is deterministic for same policy."""
         compiler = PolicyCompiler()
@@ -166,6 +224,119 @@ class TestPolicyCompiler:
         assert canonical1.canonical_form == canonical2.canonical_form
         assert canonical1.commitment_hash == canonical2.commitment_hash
     
+    def test_compile_many_matches_compile(self):
+        """Test that batch compilation matches compiling one at a time."""
+        policies = [
+            Policy(
+                policy_id=f"policy-{i}",
+                version="1.0",
+                name=f"Policy {i}",
+                statements=[
+                    PolicyStatement(
+                        sid="stmt-1",
+                        effect=PolicyEffect.ALLOW,
+                        actions=[PolicyAction.WRITE, PolicyAction.READ],
+                        resources=[f"bucket-{i}/*"]
+                    )
+                ]
+            )
+            for i in range(3)
+        ]
+        
+        batch_compiler = PolicyCompiler()
+        batch = batch_compiler.compile_many(policies)
+        single = [PolicyCompiler().compile(policy) for policy in policies]
+        
+        assert [c.commitment_hash for c in batch] == [c.commitment_hash for c in single]
+        assert [c.canonical_form for c in batch] == [c.canonical_form for c in single]
+        assert batch_compiler.get_policy("policy-2") is batch[2]
+        assert batch_compiler.get_policy_versions("policy-0") == ["1.0"]
+    
+    def test_compile_many_uses_calculate_commitment(self):
+        """Test that batch compilation hashes through _calculate_commitment."""
+        class TaggingCompiler(PolicyCompiler):
+            def _calculate_commitment(self, canonical_form):
+                return "tagged-" + super()._calculate_commitment(canonical_form)
+        
+        stmt = PolicyStatement(
+            sid="stmt-1",
+            effect=PolicyEffect.ALLOW,
+            actions=[PolicyAction.READ],
+            resources=["*"]
+        )
+        policy = Policy(policy_id="policy-1", version="1", name="Test", statements=[stmt])
+        
+        compiler = TaggingCompiler()
+        
+        assert compiler.compile_many([policy])[0].commitment_hash.startswith("tagged-")
+    
+    def test_compile_many_repeated_policy(self):
+        """Test that a policy repeated within one batch is compiled once."""
+        compiler = PolicyCompiler()
+        
+        stmt = PolicyStatement(
+            sid="stmt-1",
+            effect=PolicyEffect.ALLOW,
+            actions=[PolicyAction.READ],
+            resources=["*"]
+        )
+        policy = Policy(policy_id="policy-1", version="1", name="Test", statements=[stmt])
+        
+        first, second = compiler.compile_many([policy, policy])
+        
+        assert first is second
+        assert compiler.get_policy_versions("policy-1") == ["1"]
+        assert compiler.get_policy("policy-1") is first
+    
+    def test_recompiling_same_policy_is_cached(self):
+        """Test that recompiling an unchanged policy object reuses the result."""
+        compiler = PolicyCompiler()
+        
+        stmt = PolicyStatement(
+            sid="stmt-1",
+            effect=PolicyEffect.ALLOW,
+            actions=[PolicyAction.READ],
+            resources=["*"]
+        )
+        policy_v1 = Policy(policy_id="policy-1", version="1.0", name="Test", statements=[stmt])
+        policy_v2 = Policy(policy_id="policy-1", version="2.0", name="Test", statements=[stmt])
+        
+        canonical_v1 = compiler.compile(policy_v1)
+        canonical_v2 = compiler.compile(policy_v2)
+        
+        assert compiler.compile(policy_v1) is canonical_v1
+        assert compiler.compile_many([policy_v2]) == [canonical_v2]
+        assert compiler.get_policy("policy-1") is canonical_v2
+        assert compiler.get_policy("policy-1", version="1.0") is canonical_v1
+        assert compiler.get_policy_versions("policy-1") == ["1.0", "2.0"]
+    
+    def test_recompiling_mutated_policy(self):
+        """Test that a policy edited in place after compiling is recompiled."""
+        compiler = PolicyCompiler()
+        
+        stmt = PolicyStatement(
+            sid="stmt-1",
+            effect=PolicyEffect.ALLOW,
+            actions=[PolicyAction.READ],
+            resources=["bucket-a/*"]
+        )
+        policy = Policy(policy_id="policy-1", version="1", name="Test", statements=[stmt])
+        
+        original = compiler.compile(policy)
+        stmt.resources.append("bucket-b/*")
+        recompiled = compiler.compile(policy)
+        
+        assert recompiled.commitment_hash != original.commitment_hash
+        assert recompiled.commitment_hash == PolicyCompiler().compile(policy).commitment_hash
+        assert compiler.get_policy("policy-1") is recompiled
+        assert compiler.get_policy_versions("policy-1") == ["1", "1"]
+        
+        stmt.resources.append("bucket-c/*")
+        batch = compiler.compile_many([policy])
+        
+        assert batch[0].commitment_hash not in (original.commitment_hash, recompiled.commitment_hash)
+        assert compiler.get_policy_versions("policy-1") == ["1", "1", "1"]
+    
     def test_get_policy(self):
         """Test retrieving a compiled policy."""
         compiler = PolicyCompiler()
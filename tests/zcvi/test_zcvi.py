@@ -0,0 +1,218 @@
+"""
+Unit tests for Zero-Trust Verification API (ZCVI)
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+import json
+import random
+
+from caas.cal import AuditRecord, AuditLedger
+from caas.pac import PolicyCompiler
+from caas.zcvi import AnchoringReference, ProofBundleType, VerificationAPI
+
+
+def make_anchor(anchor_id, minute):
+    """Create an anchoring reference timestamped at 12:<minute> on 2024-01-01."""
+    return AnchoringReference(
+        anchor_type="timestamp_service",
+        anchor_id=anchor_id,
+        timestamp=datetime(2024, 1, 1, 12, minute, 0),
+        anchor_hash=f"hash-{anchor_id}"
+    )
+
+
+def make_api(record_count=3):
+    """Create a verification API over a ledger with ``record_count`` records."""
+    ledger = AuditLedger()
+    for i in range(record_count):
+        ledger.append(AuditRecord(
+            record_id=f"rec-{i}",
+            event_id=f"evt-{i}",
+            timestamp=datetime(2024, 1, 1, 12, i, 0),
+            event_type="object.create",
+            tenant_id=f"tenant-{i % 2}",
+            bucket="test-bucket",
+            object_key=f"obj-{i}.txt"
+        ))
+    
+    return VerificationAPI(ledger, PolicyCompiler())
+
+
+class TestComplianceProofBundle:
+    """Test ComplianceProofBundle class."""
+    
+    def test_iter_json_matches_to_json(self):
+        """Test that streamed JSON is the same document as to_json."""
+        api = make_api()
+        api.add_anchoring_reference(make_anchor("anchor-1", 1))
+        bundle = api.create_batch_bundle(["rec-0", "rec-1", "rec-2"])
+        bundle.metadata["note"] = "caf\u00e9"
+        
+        assert json.loads("".join(bundle.iter_json())) == json.loads(bundle.to_json())
+    
+    def test_to_json_non_string_metadata_keys(self):
+        """Test that JSON export coerces non-string keys like json.dumps."""
+        api = make_api()
+        bundle = api.create_single_record_bundle("rec-0")
+        bundle.metadata[7] = "seven"
+        
+        exported = json.loads(bundle.to_json())
+        
+        assert exported["metadata"]["7"] == "seven"
+        assert json.loads("".join(bundle.iter_json()))["metadata"]["7"] == "seven"
+    
+    def test_non_ascii_record_hash_fails_verification(self):
+        """Test that a non-ASCII record hash is reported, not raised."""
+        api = make_api()
+        bundle = api.create_single_record_bundle("rec-0")
+        bundle.records[0].record_hash = "\u00e9" * 64
+        
+        assert bundle.verify_integrity() is False
+        assert api.verify_bundle(bundle)["chain_verification"] is False
+
+
+class TestVerificationAPI:
+    """Test VerificationAPI class."""
+    
+    def test_direct_anchoring_refs_edits(self):
+        """Test that editing or replacing anchoring_refs directly is picked up."""
+        api = make_api()
+        api.add_anchoring_reference(make_anchor("late", 2))
+        api.anchoring_refs.append(make_anchor("early", 0))
+        
+        bundle = api.create_single_record_bundle("rec-0")
+        assert [ref.anchor_id for ref in bundle.anchoring_refs] == ["early"]
+        assert [ref.anchor_id for ref in api.anchoring_refs] == ["early", "late"]
+        
+        # Same length, different contents
+        api.anchoring_refs[1] = make_anchor("replaced", 1)
+        bundle = api.create_single_record_bundle("rec-1")
+        assert [ref.anchor_id for ref in bundle.anchoring_refs] == ["replaced"]
+        assert api.create_single_record_bundle("rec-2").anchoring_refs == []
+        
+        api.anchoring_refs = [make_anchor("assigned", 2)]
+        bundle = api.create_single_record_bundle("rec-2")
+        assert isinstance(api.anchoring_refs, list)
+        assert [ref.anchor_id for ref in bundle.anchoring_refs] == ["assigned"]
+        
+        api.add_anchoring_reference(make_anchor("added", 2))
+        del api.anchoring_refs[0]
+        bundle = api.create_single_record_bundle("rec-2")
+        assert [ref.anchor_id for ref in bundle.anchoring_refs] == ["added"]
+    
+    def test_time_range_bundle_matches_linear_scan(self):
+        """Test that indexed time range queries match a scan of the ledger."""
+        rng = random.Random(7)
+        base = datetime(2024, 1, 1)
+        ledger = AuditLedger()
+        for i in range(60):
+            ledger.append(AuditRecord(
+                record_id=f"rec-{i}",
+                event_id=f"evt-{i}",
+                # Out of order, with repeats, to exercise the sorted index
+                timestamp=base + timedelta(minutes=rng.randrange(30)),
+                event_type="object.create",
+                tenant_id=f"tenant-{rng.randrange(3)}",
+                bucket="test-bucket"
+            ))
+        api = VerificationAPI(ledger, PolicyCompiler())
+        
+        for _ in range(20):
+            start = base + timedelta(minutes=rng.randrange(30))
+            end = start + timedelta(minutes=rng.randrange(10))
+            for tenant_id in (None, "tenant-0", "tenant-2", "tenant-missing"):
+                expected = [
+                    r.record_id for r in ledger.records
+                    if start <= r.timestamp <= end
+                    and (tenant_id is None or r.tenant_id == tenant_id)
+                ]
+                bundle = api.create_time_range_bundle(start, end, tenant_id=tenant_id)
+                
+                assert [r.record_id for r in bundle.records] == expected
+        
+        for tenant_id in ("tenant-0", "tenant-1", "tenant-2"):
+            expected = [r.record_id for r in ledger.records if r.tenant_id == tenant_id]
+            bundle = api.create_tenant_bundle(tenant_id)
+            
+            assert [r.record_id for r in bundle.records] == expected
+    
+    def test_index_picks_up_new_records(self):
+        """Test that records appended after a query are found by the next one."""
+        api = make_api()
+        assert len(api.create_tenant_bundle("tenant-0").records) == 2
+        
+        api.ledger.append(AuditRecord(
+            record_id="rec-new",
+            event_id="evt-new",
+            timestamp=datetime(2024, 1, 1, 11, 0, 0),
+            event_type="object.create",
+            tenant_id="tenant-0",
+            bucket="test-bucket"
+        ))
+        
+        bundle = api.create_time_range_bundle(
+            datetime(2024, 1, 1, 11, 0, 0), datetime(2024, 1, 1, 12, 0, 0)
+        )
+        
+        assert [r.record_id for r in bundle.records] == ["rec-0", "rec-new"]
+        assert len(api.create_tenant_bundle("tenant-0").records) == 3
+    
+    def test_unorderable_timestamps_leave_indexes_consistent(self):
+        """Test that a failed time index update is not half-applied."""
+        ledger = AuditLedger()
+        for tenant_id, timestamp in [
+            ("tenant-a", datetime(2024, 1, 1, 12, 0, 0)),
+            ("tenant-b", datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)),
+        ]:
+            ledger.append(AuditRecord(
+                record_id=f"rec-{tenant_id}",
+                event_id=f"evt-{tenant_id}",
+                timestamp=timestamp,
+                event_type="object.create",
+                tenant_id=tenant_id,
+                bucket="test-bucket"
+            ))
+        api = VerificationAPI(ledger, PolicyCompiler())
+        
+        # Naive and aware timestamps cannot be ordered, as in a linear scan
+        for _ in range(2):
+            with pytest.raises(TypeError):
+                api.create_time_range_bundle(datetime(2024, 1, 1), datetime(2024, 1, 2))
+        
+        # Tenant bundles never compare timestamps across tenants
+        for _ in range(2):
+            assert len(api.create_tenant_bundle("tenant-a").records) == 1
+            assert len(api.create_tenant_bundle("tenant-b").records) == 1
+        assert len(api._by_time.keys) == 1
+    
+    def test_empty_bundles(self):
+        """Test that queries matching no records return empty bundles."""
+        api = make_api()
+        
+        time_bundle = api.create_time_range_bundle(
+            datetime(2023, 1, 1), datetime(2023, 12, 31), include_merkle_proofs=True
+        )
+        tenant_bundle = api.create_tenant_bundle("tenant-missing", include_merkle_proofs=True)
+        
+        for bundle in (time_bundle, tenant_bundle):
+            assert bundle is not None
+            assert bundle.records == []
+            assert bundle.merkle_proofs == []
+            assert bundle.anchoring_refs == []
+            assert bundle.metadata["record_count"] == 0
+            assert bundle.verify_integrity()
+        
+        assert time_bundle.bundle_type == ProofBundleType.TIME_RANGE
+        assert tenant_bundle.bundle_type == ProofBundleType.TENANT_SCOPE
+        assert tenant_bundle.metadata["tenant_id"] == "tenant-missing"
+    
+    def test_anchor_selection(self):
+        """Test that bundles carry the anchors inside their records' time span."""
+        api = make_api()
+        for anchor_id, minute in [("before", 0), ("inside", 1), ("edge", 2), ("after", 5)]:
+            api.add_anchoring_reference(make_anchor(anchor_id, minute))
+        
+        bundle = api.create_batch_bundle(["rec-1", "rec-2"])
+        
+        assert [ref.anchor_id for ref in bundle.anchoring_refs] == ["inside", "edge"]